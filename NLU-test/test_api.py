@@ -3,16 +3,69 @@ Test script for NLU Parser API
 Tests various intents, languages, and scenarios
 """
 
-import requests
+import asyncio
 import json
-from datetime import datetime
-from typing import Dict, List
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import aiohttp
+
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    json_loads = json.loads
 
 # API endpoint
 API_URL = "http://localhost:6060/nlu/parse"
 
+# Endpoint URLs derived once from API_URL, keyed by test case 'endpoint'
+_BASE = API_URL.rsplit('/', 1)[0]
+URLS = {
+    'parse': API_URL,
+    'pre-parse': f'{_BASE}/pre-parse',
+    'post-parse': f'{_BASE}/post-parse'
+}
+BATCH_URLS = {endpoint: f'{url}/batch' for endpoint, url in URLS.items()}
+HEALTH_URL = f'{_BASE.rsplit("/", 1)[0]}/health'
+
+# Adaptive concurrency: start with a few requests in flight, never exceed the max
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# Responses that signal an overloaded server rather than a test failure
+OVERLOAD_STATUSES = {429, 500, 502, 503, 504}
+
+# Transient responses retried with exponential backoff and jitter
+RETRY_STATUSES = {429, 502, 503, 504}
+RETRY_TRIES = 3
+RETRY_BACKOFF_BASE = 0.2  # seconds
+RETRY_BACKOFF_CAP = 2.0  # seconds
+
+# Results buffered between the request producers and the printing consumer
+RESULT_QUEUE_SIZE = 8
+
+# Successful responses keyed by cache_key(), reused for identical test cases
+_CACHE: Dict[tuple, tuple] = {}
+
+# Request bodies are pre-serialised, so the content type is set explicitly
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json'
+}
+
+# Transport-level failures for a single request
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
 # Test cases with expected results
-TEST_CASES = [
+_RAW_TEST_CASES = [
     {
         "name": "Confirm Substitution (English)",
         "text": "Yes, I'll accept the replacement milk",
@@ -164,100 +217,415 @@ TEST_CASES = [
 ]
 
 
-def print_result(test_name: str, response: Dict, expected: Dict):
+@dataclass(slots=True, frozen=True)
+class TestCase:
+    """A single API test case with its expected results"""
+    __test__ = False  # Not a pytest test class
+    
+    name: str
+    text: str
+    expected_intent: str
+    expected_sentiment: str
+    endpoint: str = 'parse'
+    context: Optional[Dict] = None
+
+
+TEST_CASES = tuple(TestCase(**test_case) for test_case in _RAW_TEST_CASES)
+
+
+def tally(observations: List) -> tuple:
+    """
+    Count (passed, partial, failed) from (test_case, intent, polarity) outcomes
+    
+    A test passes when both intent and sentiment match, and is partial when only one does.
+    """
+    matches = Counter(
+        (intent == test_case.expected_intent) + (polarity == test_case.expected_sentiment)
+        for test_case, intent, polarity in observations
+    )
+    return matches[2], matches[1], matches[0]
+
+
+def dig(data, *keys):
+    """Walk nested dicts by keys, returning None as soon as a key is missing"""
+    for key in keys:
+        data = data.get(key) if isinstance(data, dict) else None
+        if data is None:
+            return None
+    return data
+
+
+def print_result(test_name: str, response: Dict, expected: TestCase):
     """Print formatted test result"""
-    print(f"\n{'='*70}")
-    print(f"Test: {test_name}")
-    print(f"{'='*70}")
-    print(f"Input: \"{expected['text']}\"")
-    print(f"\nResults:")
-    print(f"  Intent: {response.get('intent', 'N/A')} (expected: {expected.get('expected_intent', 'N/A')})")
-    print(f"  Confidence: {response.get('confidence', 0):.1%}")
+    out = []
+    out.append(f"\n{'='*70}")
+    out.append(f"Test: {test_name}")
+    out.append(f"{'='*70}")
+    out.append(f"Input: \"{expected.text}\"")
+    out.append(f"\nResults:")
+    out.append(f"  Intent: {response.get('intent', 'N/A')} (expected: {expected.expected_intent})")
+    out.append(f"  Confidence: {response.get('confidence', 0):.1%}")
     
-    entities = response.get('parameters', {}).get('entities', {})
-    sentiment = entities.get('sentiment', {})
-    print(f"  Sentiment: {sentiment.get('polarity', 'N/A')} (expected: {expected.get('expected_sentiment', 'N/A')}) "
-          f"[confidence: {sentiment.get('confidence', 0):.1%}]")
-    print(f"  Language: {entities.get('language', 'N/A')}")
+    entities = dig(response, 'parameters', 'entities') or {}
+    sentiment = entities.get('sentiment') or {}
+    out.append(f"  Sentiment: {sentiment.get('polarity', 'N/A')} (expected: {expected.expected_sentiment}) "
+               f"[confidence: {sentiment.get('confidence', 0):.1%}]")
+    out.append(f"  Language: {entities.get('language', 'N/A')}")
     
     products = entities.get('products', [])
     if products:
-        print(f"  Products found: {len(products)}")
+        out.append(f"  Products found: {len(products)}")
         for p in products[:3]:
-            print(f"    - {p.get('name', 'Unknown')} (GTIN: {p.get('gtin', 'N/A')})")
+            out.append(f"    - {p.get('name', 'Unknown')} (GTIN: {p.get('gtin', 'N/A')})")
     
     quantities = entities.get('quantities', [])
     if quantities:
         qty_strs = [f"{q.get('value')} {q.get('unit')}" for q in quantities[:3]]
-        print(f"  Quantities: {', '.join(qty_strs)}")
+        out.append(f"  Quantities: {', '.join(qty_strs)}")
     
     urgency = entities.get('urgency', {})
     if urgency.get('level') != 'low':
-        print(f"  Urgency: {urgency.get('level', 'N/A')} [confidence: {urgency.get('confidence', 0):.1%}]")
+        out.append(f"  Urgency: {urgency.get('level', 'N/A')} [confidence: {urgency.get('confidence', 0):.1%}]")
     
     # Order numbers
     order_numbers = entities.get('order_numbers', [])
     if order_numbers:
-        print(f"  Order Numbers: {', '.join([o.get('value', 'N/A') for o in order_numbers[:3]])}")
+        out.append(f"  Order Numbers: {', '.join([o.get('value', 'N/A') for o in order_numbers[:3]])}")
     
     # Dates
     dates = entities.get('dates', [])
     if dates:
-        print(f"  Dates: {', '.join([d.get('value', 'N/A') for d in dates[:3]])}")
+        out.append(f"  Dates: {', '.join([d.get('value', 'N/A') for d in dates[:3]])}")
     
     # Reasons
     reasons = entities.get('reasons', [])
     if reasons:
-        print(f"  Reasons: {', '.join([r.get('type', 'N/A') for r in reasons[:3]])}")
+        out.append(f"  Reasons: {', '.join([r.get('type', 'N/A') for r in reasons[:3]])}")
     
     # Metadata (for pre-parse and post-parse endpoints)
     metadata = response.get('metadata', {})
     if metadata:
         conversation_stage = metadata.get('conversation_stage')
         if conversation_stage:
-            print(f"  Conversation Stage: {conversation_stage}")
+            out.append(f"  Conversation Stage: {conversation_stage}")
         priority_entities = metadata.get('priority_entities', [])
         if priority_entities:
-            print(f"  Priority Entities: {', '.join(priority_entities)}")
+            out.append(f"  Priority Entities: {', '.join(priority_entities)}")
         if metadata.get('missing_order_warning'):
-            print(f"  ⚠️  Warning: Missing order number for issue report")
+            out.append(f"  ⚠️  Warning: Missing order number for issue report")
     
     # Check if expectations match
-    intent_match = response.get('intent') == expected.get('expected_intent')
-    sentiment_match = sentiment.get('polarity') == expected.get('expected_sentiment')
+    intent_match = response.get('intent') == expected.expected_intent
+    sentiment_match = sentiment.get('polarity') == expected.expected_sentiment
     
     if intent_match and sentiment_match:
-        print(f"\n✅ PASS - Intent and sentiment match expectations")
+        out.append(f"\n✅ PASS - Intent and sentiment match expectations")
     elif intent_match:
-        print(f"\n⚠️  PARTIAL - Intent matches, but sentiment is {sentiment.get('polarity')} (expected {expected.get('expected_sentiment')})")
+        out.append(f"\n⚠️  PARTIAL - Intent matches, but sentiment is {sentiment.get('polarity')} (expected {expected.expected_sentiment})")
     elif sentiment_match:
-        print(f"\n⚠️  PARTIAL - Sentiment matches, but intent is {response.get('intent')} (expected {expected.get('expected_intent')})")
+        out.append(f"\n⚠️  PARTIAL - Sentiment matches, but intent is {response.get('intent')} (expected {expected.expected_intent})")
     else:
-        print(f"\n❌ FAIL - Intent: {response.get('intent')} (expected {expected.get('expected_intent')}), "
-              f"Sentiment: {sentiment.get('polarity')} (expected {expected.get('expected_sentiment')})")
+        out.append(f"\n❌ FAIL - Intent: {response.get('intent')} (expected {expected.expected_intent}), "
+                   f"Sentiment: {sentiment.get('polarity')} (expected {expected.expected_sentiment})")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
-def run_tests():
-    """Run all test cases"""
-    print("🧪 NLU Parser API Test Suite")
-    print("=" * 70)
-    print(f"API Endpoint: {API_URL}")
-    print(f"Test Cases: {len(TEST_CASES)}")
-    print("=" * 70)
+def build_payload(index: int, test_case: TestCase) -> Dict:
+    """Build the request payload for a test case"""
+    # Generate valid session_id (digits only, no separator to sanitize)
+    session_id = f'test_{index}_{time.monotonic_ns()}'
+    
+    payload = {
+        'text': test_case.text,
+        'session_id': session_id
+    }
+    
+    # Add context if provided
+    if test_case.context is not None:
+        payload['context'] = test_case.context
+    
+    return payload
+
+
+async def read_body(response: aiohttp.ClientResponse):
+    """Decode a JSON response body"""
+    return json_loads(await response.read())
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit (additive increase, multiplicative decrease)
+    
+    Requests are counted in windows. After a window without errors the limit
+    grows by one; after a window with errors (timeouts, connection failures or
+    overload statuses) it is halved. Once the limit has held through
+    `settle_windows` clean windows in a row it stops growing, and only errors
+    move it again.
+    """
+    
+    def __init__(self, initial: int, maximum: int, window: int = 10, settle_windows: int = 3):
+        self.limit = initial
+        self.maximum = maximum
+        self.window = window
+        self.settle_windows = settle_windows
+        self._in_flight = 0
+        self._successes = 0
+        self._errors = 0
+        self._clean_windows = 0
+        self._condition = asyncio.Condition()
+    
+    def slot(self) -> 'AIMDSlot':
+        """Reserve one request slot: `async with limiter.slot() as slot:`"""
+        return AIMDSlot(self)
+    
+    async def _acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+    
+    async def _release(self, failed: bool):
+        async with self._condition:
+            self._in_flight -= 1
+            if failed:
+                self._errors += 1
+            else:
+                self._successes += 1
+            if self._successes + self._errors >= self.window:
+                self._adjust()
+            self._condition.notify_all()
+    
+    def _adjust(self):
+        """Resize the limit from the window that just completed"""
+        if self._errors:
+            self.limit = max(1, self.limit // 2)
+            self._clean_windows = 0
+        elif self._clean_windows < self.settle_windows:
+            self.limit = min(self.maximum, self.limit + 1)
+            self._clean_windows += 1
+        self._successes = 0
+        self._errors = 0
+
+
+class AIMDSlot:
+    """One in-flight request of an AIMDLimiter; set `failed` to report overload"""
+    
+    def __init__(self, limiter: AIMDLimiter):
+        self.limiter = limiter
+        self.failed = False
+    
+    async def __aenter__(self) -> 'AIMDSlot':
+        await self.limiter._acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.limiter._release(self.failed or exc_type is not None)
+        return False
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)"""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form is not used by the NLU server
+    return min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+async def post_with_retry(session: aiohttp.ClientSession, limiter: AIMDLimiter,
+                          url: str, body: bytes, timeout: float, tries: int = RETRY_TRIES):
+    """
+    POST a JSON body, retrying transient overload responses with backoff
     
-    # Check if server is running
+    Returns:
+        (status_code, data) with decoded data for 200, or the response text otherwise
+    """
+    for attempt in range(tries):
+        async with limiter.slot() as slot:
+            async with session.post(
+                url,
+                data=body,
+                headers=JSON_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 200:
+                    return 200, await read_body(response)
+                slot.failed = response.status in OVERLOAD_STATUSES
+                if response.status not in RETRY_STATUSES or attempt == tries - 1:
+                    return response.status, await response.text()
+                retry_after = response.headers.get('Retry-After')
+        
+        # Back off outside the slot so other requests can use it meanwhile
+        await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+
+async def post_batch(session: aiohttp.ClientSession, limiter: AIMDLimiter,
+                     endpoint: str, cases: List) -> Optional[List]:
+    """
+    Post all test cases of one endpoint kind in a single batch request
+    
+    Args:
+        session: Shared HTTP client session
+        limiter: Adaptive limit on the number of requests in flight
+        endpoint: Endpoint kind ('parse', 'pre-parse' or 'post-parse')
+        cases: List of (index, test_case) tuples
+        
+    Returns:
+        List of (status_code, data_or_text) per case, or None if the batch
+        request failed as a whole (e.g. older server without batch routes)
+    """
+    items = [build_payload(i, test_case) for i, test_case in cases]
+    status_code, data = await post_with_retry(
+        session, limiter, BATCH_URLS[endpoint], json_dumps({'items': items}), 5 + len(items)
+    )
+    if status_code != 200:
+        return None
+    
+    results = []
+    for result in data.get('results', []):
+        if 'error' in result:
+            results.append((500, result['error']))
+        else:
+            results.append((200, result))
+    return results
+
+
+async def post_single(session: aiohttp.ClientSession, limiter: AIMDLimiter,
+                      endpoint: str, index: int, test_case: TestCase):
+    """Post a single test case, returning (status_code, data_or_text)"""
+    return await post_with_retry(
+        session, limiter, URLS[endpoint], json_dumps(build_payload(index, test_case)), 5
+    )
+
+
+def cache_key(endpoint: str, test_case: TestCase) -> tuple:
+    """Key identifying identical requests: endpoint, text and context"""
+    context = test_case.context or {}
+    return endpoint, test_case.text, json.dumps(context, sort_keys=True)
+
+
+async def run_group(session: aiohttp.ClientSession, limiter: AIMDLimiter,
+                    queue: asyncio.Queue, endpoint: str, cases: List):
+    """
+    Producer: run one endpoint group, batching when the server supports it
+    
+    Puts (index, test_case, result) on the queue for every case, where result
+    is (status_code, data_or_text) or the exception raised by the request.
+    Identical requests are sent once and successful results are cached.
+    """
+    # Serve cached results and collapse duplicates onto one request each
+    pending: Dict[tuple, List] = {}
+    for i, test_case in cases:
+        key = cache_key(endpoint, test_case)
+        if key in _CACHE:
+            await queue.put((i, test_case, _CACHE[key]))
+        else:
+            pending.setdefault(key, []).append((i, test_case))
+    
+    if not pending:
+        return
+    
+    async def deliver(key: tuple, result):
+        if isinstance(result, tuple) and result[0] == 200:
+            _CACHE[key] = result
+        for i, test_case in pending[key]:
+            await queue.put((i, test_case, result))
+    
+    unique_cases = [duplicates[0] for duplicates in pending.values()]
+    
+    try:
+        batch_results = await post_batch(session, limiter, endpoint, unique_cases)
+    except REQUEST_ERRORS as e:
+        batch_results = [e] * len(unique_cases)
+    
+    if batch_results is not None:
+        for n, key in enumerate(pending):
+            await deliver(key, batch_results[n] if n < len(batch_results) else None)
+        return
+    
+    # Batch not supported or rejected - fall back to one request per test case
+    async def run_single(key: tuple, i: int, test_case: TestCase):
+        try:
+            result = await post_single(session, limiter, endpoint, i, test_case)
+        except REQUEST_ERRORS as e:
+            result = e
+        await deliver(key, result)
+    
+    await asyncio.gather(*[
+        run_single(key, i, test_case)
+        for key, (i, test_case) in zip(pending, unique_cases)
+    ])
+
+
+def record_result(i: int, test_case: TestCase, result, results: Dict, observations: List):
+    """Print one test result, recording its (intent, sentiment) outcome for the tally"""
     try:
-        health_response = requests.get(API_URL.replace('/nlu/parse', '/health'), timeout=2)
-        if health_response.status_code == 200:
-            print("✅ API server is running\n")
+        if isinstance(result, Exception):
+            raise result
+        if result is None:
+            raise ValueError("No result returned for test case")
+        
+        status_code, data = result
+        if status_code == 200:
+            print_result(test_case.name, data, test_case)
+            
+            # Keep the outcome; pass/partial/fail are tallied once all results are in
+            observations.append((
+                test_case,
+                data.get('intent'),
+                dig(data, 'parameters', 'entities', 'sentiment', 'polarity')
+            ))
         else:
-            print("⚠️  API server health check returned non-200 status\n")
-    except requests.exceptions.RequestException as e:
+            print(f"\n❌ Test {i} failed with status {status_code}")
+            print(f"   Response: {data}")
+            results['errors'] += 1
+            
+    except REQUEST_ERRORS as e:
+        print(f"\n❌ Test {i} error: {e!r}")
+        results['errors'] += 1
+    except Exception as e:
+        print(f"\n❌ Test {i} unexpected error: {e}")
+        results['errors'] += 1
+
+
+async def consume_results(queue: asyncio.Queue, results: Dict, observations: List):
+    """Consumer: print results as producers deliver them"""
+    while True:
+        i, test_case, result = await queue.get()
+        try:
+            record_result(i, test_case, result, results, observations)
+        finally:
+            queue.task_done()
+
+
+async def check_health(session: aiohttp.ClientSession) -> bool:
+    """Check if the API server is running, returning False if unreachable"""
+    try:
+        async with session.get(
+            HEALTH_URL,
+            timeout=aiohttp.ClientTimeout(total=2)
+        ) as health_response:
+            if health_response.status == 200:
+                print("✅ API server is running\n")
+            else:
+                print("⚠️  API server health check returned non-200 status\n")
+        return True
+    except REQUEST_ERRORS as e:
         print(f"❌ Cannot connect to API server at {API_URL}")
         print(f"   Error: {e}")
         print(f"\n   Make sure the server is running:")
         print(f"   cd NLU && python app.py")
-        return
+        return False
+
+
+async def run_tests():
+    """Run all test cases"""
+    print("🧪 NLU Parser API Test Suite")
+    print("=" * 70)
+    print(f"API Endpoint: {API_URL}")
+    print(f"Test Cases: {len(TEST_CASES)}")
+    print("=" * 70)
     
     results = {
         'total': len(TEST_CASES),
@@ -267,63 +635,37 @@ def run_tests():
         'errors': 0
     }
     
-    for i, test_case in enumerate(TEST_CASES, 1):
+    # One pooled keep-alive session for the health check and every test request
+    limiter = AIMDLimiter(INITIAL_CONCURRENCY, MAX_CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=32, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Start the health check, then group the test cases while it is in flight;
+        # its kept-alive connection is reused by the first POST
+        health_task = asyncio.create_task(check_health(session))
+        await asyncio.sleep(0)
+        
+        # Group test cases by endpoint kind so each group is sent as one batch
+        groups: Dict[str, List] = {}
+        for i, test_case in enumerate(TEST_CASES, 1):
+            groups.setdefault(test_case.endpoint, []).append((i, test_case))
+        
+        if not await health_task:
+            return
+        
+        # Producers post all groups concurrently; one consumer prints results
+        # as they arrive so output formatting overlaps network I/O
+        queue: asyncio.Queue = asyncio.Queue(maxsize=RESULT_QUEUE_SIZE)
+        observations: List = []
+        consumer = asyncio.create_task(consume_results(queue, results, observations))
         try:
-            # Determine which endpoint to use
-            endpoint = test_case.get('endpoint', 'parse')
-            if endpoint == 'pre-parse':
-                url = API_URL.replace('/nlu/parse', '/nlu/pre-parse')
-            elif endpoint == 'post-parse':
-                url = API_URL.replace('/nlu/parse', '/nlu/post-parse')
-            else:
-                url = API_URL
-            
-            # Make API request
-            # Generate valid session_id (replace dots with underscores)
-            timestamp = str(datetime.now().timestamp()).replace('.', '_')
-            session_id = f'test_{i}_{timestamp}'
-            
-            # Build request payload
-            payload = {
-                'text': test_case['text'],
-                'session_id': session_id
-            }
-            
-            # Add context if provided
-            if 'context' in test_case:
-                payload['context'] = test_case['context']
-            
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=5
+            await asyncio.gather(
+                *[run_group(session, limiter, queue, endpoint, cases) for endpoint, cases in groups.items()]
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                print_result(test_case['name'], data, test_case)
-                
-                # Check results
-                intent_match = data.get('intent') == test_case.get('expected_intent')
-                sentiment_match = data.get('parameters', {}).get('entities', {}).get('sentiment', {}).get('polarity') == test_case.get('expected_sentiment')
-                
-                if intent_match and sentiment_match:
-                    results['passed'] += 1
-                elif intent_match or sentiment_match:
-                    results['partial'] += 1
-                else:
-                    results['failed'] += 1
-            else:
-                print(f"\n❌ Test {i} failed with status {response.status_code}")
-                print(f"   Response: {response.text}")
-                results['errors'] += 1
-                
-        except requests.exceptions.RequestException as e:
-            print(f"\n❌ Test {i} error: {e}")
-            results['errors'] += 1
-        except Exception as e:
-            print(f"\n❌ Test {i} unexpected error: {e}")
-            results['errors'] += 1
+            await queue.join()
+        finally:
+            consumer.cancel()
+    
+    results['passed'], results['partial'], results['failed'] = tally(observations)
     
     # Print summary
     print(f"\n{'='*70}")
@@ -342,5 +684,5 @@ def run_tests():
 
 
 if __name__ == '__main__':
-    run_tests()
+    asyncio.run(run_tests())
 
@@ -4,22 +4,39 @@ Provides intent classification and entity extraction from text/voice transcripts
 """
 
 import logging
+import os
 import time
-from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-from flask import Flask, request, jsonify
+import numpy as np
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from config import config
 from errors import InternalError, ParseError, ValidationError, NLUError
 from language_detector import LanguageDetector
 from intent_classifier import IntentClassifier
 from entity_extractor import EntityExtractor
 from product_catalog import ProductCatalog
+from response_cache import response_cache
 from session_manager import session_manager
 from text_normalizer import TextNormalizer
-from validators import validate_batch_request, validate_context, validate_session_id, validate_text
+from validators import (
+    validate_batch_items,
+    validate_batch_request,
+    validate_context,
+    validate_session_id,
+    validate_text,
+)
 
 # Configure logging
 log_level = getattr(logging, config.get('logging.level', 'INFO'))
@@ -29,7 +46,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    option = (orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        """Serialize obj to a JSON string"""
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response without the intermediate str"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 
 # Configure CORS
 cors_origins = config.get('cors.origins', '*')
@@ -46,9 +88,74 @@ intent_classifier = IntentClassifier()
 entity_extractor = EntityExtractor()
 product_catalog = ProductCatalog()
 
+# Thread pool for parsing batch items concurrently
+_batch_pool = ThreadPoolExecutor(
+    max_workers=config.get('api.batch_workers') or min(8, os.cpu_count() or 4),
+    thread_name_prefix='nlu-batch'
+)
+
 # Track startup time for health check
 _startup_time = time.time()
 
+# Confidence thresholds (config is fixed at runtime, so resolve once)
+MIN_INTENT_CONFIDENCE = config.get('confidence.min_intent_confidence', 0.3)
+MIN_ENTITY_CONFIDENCE = config.get('confidence.min_entity_confidence', 0.4)
+UNCERTAIN_THRESHOLD = config.get('confidence.uncertain_threshold', 0.6)
+
+# Below this intent confidence, skip product matching and sentiment (text-only entities are kept)
+ENTITY_SKIP_THRESHOLD = MIN_INTENT_CONFIDENCE * 0.5
+
+# (second, formatted prefix) of the last timestamp, swapped as one tuple
+_timestamp_prefix = (0, '')
+
+
+def _utc_timestamp() -> str:
+    """
+    Format the current UTC time as an ISO 8601 string with microseconds
+    
+    The date/time part only changes once a second, so it is formatted once
+    per second and reused.
+    
+    Returns:
+        Timestamp like '2025-01-15T10:30:00.123456Z'
+    """
+    global _timestamp_prefix
+    
+    now_ns = time.time_ns()
+    second = now_ns // 1_000_000_000
+    cached_second, prefix = _timestamp_prefix
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_prefix = (second, prefix)
+    
+    return f"{prefix}.{(now_ns // 1000) % 1_000_000:06d}Z"
+
+
+# Entity lists at least this long are filtered with a NumPy mask
+VECTORIZED_FILTER_MIN = 16
+
+
+def _filter_by_confidence(items: List[Dict], threshold: float) -> List[Dict]:
+    """
+    Keep entities whose confidence is at least threshold
+    
+    Args:
+        items: Entity dictionaries with an optional 'confidence' key
+        threshold: Minimum confidence to keep
+        
+    Returns:
+        Filtered list in original order
+    """
+    if len(items) < VECTORIZED_FILTER_MIN:
+        return [item for item in items if item.get('confidence', 0) >= threshold]
+    
+    confidences = np.fromiter(
+        (item.get('confidence', 0) for item in items),
+        dtype=np.float64,
+        count=len(items)
+    )
+    return [items[i] for i in np.flatnonzero(confidences >= threshold)]
+
 
 def apply_confidence_filters(intent: str, confidence: float, entities: Dict) -> Dict:
     """
@@ -62,37 +169,27 @@ def apply_confidence_filters(intent: str, confidence: float, entities: Dict) ->
     Returns:
         Filtered entities with uncertainty flag
     """
-    min_intent_confidence = config.get('confidence.min_intent_confidence', 0.3)
-    min_entity_confidence = config.get('confidence.min_entity_confidence', 0.4)
-    uncertain_threshold = config.get('confidence.uncertain_threshold', 0.6)
-    
     # Filter products by confidence
     if 'products' in entities:
-        entities['products'] = [
-            p for p in entities['products']
-            if p.get('confidence', 0) >= min_entity_confidence
-        ]
+        entities['products'] = _filter_by_confidence(entities['products'], MIN_ENTITY_CONFIDENCE)
     
     # Filter quantities by confidence
     if 'quantities' in entities:
-        entities['quantities'] = [
-            q for q in entities['quantities']
-            if q.get('confidence', 0) >= min_entity_confidence
-        ]
+        entities['quantities'] = _filter_by_confidence(entities['quantities'], MIN_ENTITY_CONFIDENCE)
     
     # Add uncertainty flag
-    uncertain = confidence < uncertain_threshold
+    uncertain = confidence < UNCERTAIN_THRESHOLD
     
     return {
         'entities': entities,
         'uncertain': uncertain,
-        'confidence_below_threshold': confidence < min_intent_confidence
+        'confidence_below_threshold': confidence < MIN_INTENT_CONFIDENCE
     }
 
 
-def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Optional[str] = None) -> Dict:
+def _prepare_text(text: str, context: Optional[Dict], session_id: Optional[str]) -> Tuple[str, str, Optional[Dict]]:
     """
-    Parse a single text input
+    Detect language, normalize text and merge session context
     
     Args:
         text: Input text
@@ -100,10 +197,8 @@ def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Opt
         session_id: Optional session ID
         
     Returns:
-        Parsed result dictionary
+        Tuple of (normalized_text, detected_language, context)
     """
-    start_time = time.time()
-    
     # Normalize text (handle voice-to-text characteristics)
     # First detect language on original text, then normalize
     detected_language = language_detector.detect(text)
@@ -119,14 +214,36 @@ def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Opt
         else:
             context = session_context
     
-    # Use normalized text for parsing
-    text = normalized_text
-    
-    # Classify intent
-    intent, intent_confidence = intent_classifier.classify(text, detected_language, context)
+    return normalized_text, detected_language, context
+
+
+def _build_response(text: str, detected_language: str, context: Optional[Dict], session_id: Optional[str],
+                    intent: str, intent_confidence: float, start_time: float,
+                    priority_entities: Optional[List[str]] = None) -> Dict:
+    """
+    Extract entities for a classified text and build the parse response
     
+    Args:
+        text: Normalized text
+        detected_language: Detected language code
+        context: Merged context
+        session_id: Optional session ID
+        intent: Classified intent
+        intent_confidence: Intent confidence
+        start_time: time.time() when parsing started
+        priority_entities: Optional entity types to boost
+        
+    Returns:
+        Parsed result dictionary
+    """
     # Extract entities (pass detected intent for context-aware sentiment)
-    entities = entity_extractor.extract(text, detected_language, context, detected_intent=intent)
+    if intent_confidence < ENTITY_SKIP_THRESHOLD:
+        entities = entity_extractor.extract_text_only(text, detected_language, priority_entities=priority_entities)
+    else:
+        entities = entity_extractor.extract(
+            text, detected_language, context,
+            priority_entities=priority_entities, detected_intent=intent
+        )
     
     # Apply confidence filters
     filtered = apply_confidence_filters(intent, intent_confidence, entities)
@@ -140,7 +257,7 @@ def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Opt
             'language': detected_language,
             'context': context or {}
         },
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': _utc_timestamp(),
         'session_id': session_id,
         'uncertain': filtered['uncertain'],
         'processing_time_ms': int((time.time() - start_time) * 1000)
@@ -151,13 +268,218 @@ def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Opt
         session_manager.add_to_history(session_id, intent, text, filtered['entities'])
     
     logger.info(
-        f"Parsed intent: {intent} (confidence: {intent_confidence:.2f}, "
-        f"time: {response['processing_time_ms']}ms, session: {session_id})"
+        "Parsed intent: %s (confidence: %.2f, time: %dms, session: %s)",
+        intent, intent_confidence, response['processing_time_ms'], session_id
+    )
+    
+    return response
+
+
+def _cached_response(cache_key: Optional[Tuple], start_time: float) -> Optional[Dict]:
+    """
+    Get a cached parse response with fresh timestamp and timing
+    
+    Args:
+        cache_key: Key from response_cache.make_key (None: not cacheable)
+        start_time: time.time() when parsing started
+        
+    Returns:
+        Cached response, or None on a miss
+    """
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        cached['timestamp'] = _utc_timestamp()
+        cached['processing_time_ms'] = int((time.time() - start_time) * 1000)
+    return cached
+
+
+def parse_single_text(text: str, context: Optional[Dict] = None, session_id: Optional[str] = None,
+                      priority_entities: Optional[List[str]] = None) -> Dict:
+    """
+    Parse a single text input
+    
+    Args:
+        text: Input text
+        context: Optional context
+        session_id: Optional session ID
+        priority_entities: Optional entity types to boost during extraction
+        
+    Returns:
+        Parsed result dictionary
+    """
+    start_time = time.time()
+    
+    # Serve repeated utterances from cache (sessions carry history, so skip them);
+    # the catalog version keeps product matches from before a reload out
+    cache_key = None
+    if not session_id:
+        cache_key = response_cache.make_key(text, context, priority_entities, product_catalog.version)
+        cached = _cached_response(cache_key, start_time)
+        if cached is not None:
+            return cached
+    
+    text, detected_language, context = _prepare_text(text, context, session_id)
+    
+    # Classify intent
+    intent, intent_confidence = intent_classifier.classify(text, detected_language, context)
+    
+    response = _build_response(
+        text, detected_language, context, session_id,
+        intent, intent_confidence, start_time, priority_entities
     )
+    response_cache.put(cache_key, response)
     
     return response
 
 
+def _session_waves(items: List[Dict]) -> List[List[int]]:
+    """
+    Group batch item indices into waves holding at most one item per session
+    
+    Items sharing a session must see each other's history, so the n-th item
+    of a session goes into wave n. Items without a session all go into the
+    first wave.
+    
+    Args:
+        items: List of {"text", "context", "session_id"} dictionaries
+        
+    Returns:
+        Lists of item indices, in the order they must run
+    """
+    waves: List[List[int]] = []
+    session_waves: Dict[str, int] = {}
+    for i, item in enumerate(items):
+        wave = 0
+        session_id = item['session_id']
+        if session_id:
+            wave = session_waves.get(session_id, -1) + 1
+            session_waves[session_id] = wave
+        if wave == len(waves):
+            waves.append([])
+        waves[wave].append(i)
+    
+    return waves
+
+
+def _map_wave(fn: Callable, wave: List) -> List:
+    """Run fn over a wave on the batch pool (inline for a single item)"""
+    if len(wave) == 1:
+        return [fn(wave[0])]
+    return list(_batch_pool.map(fn, wave))
+
+
+def iter_parse_texts(items: List[Dict]) -> Iterator[Tuple[int, Dict]]:
+    """
+    Parse several texts, yielding each result as soon as it is ready
+    
+    Texts that need the semantic fallback are vectorized together and the
+    per-item stages run on the batch thread pool. Items sharing a session run
+    in successive waves (see _session_waves); within a wave, results are
+    yielded in completion order. A failing item yields an error result
+    instead of failing the whole batch. As in parse_single_text, sessionless
+    items go through the response cache and each result's processing time
+    counts from the start of that item.
+    
+    Args:
+        items: List of {"text", "context", "session_id"} dictionaries
+        
+    Yields:
+        Tuples of (item_index, parsed_result)
+    """
+    start_times: Dict[int, float] = {}
+    cache_keys: Dict[int, Optional[Tuple]] = {}
+    
+    def prepare(i: int):
+        item = items[i]
+        start_times[i] = time.time()
+        try:
+            # Serve repeated sessionless utterances from cache, as parse_single_text does
+            if not item['session_id']:
+                cache_keys[i] = response_cache.make_key(item['text'], item['context'], catalog_version=product_catalog.version)
+                cached = _cached_response(cache_keys[i], start_times[i])
+                if cached is not None:
+                    return i, None, cached
+            return i, _prepare_text(item['text'], item['context'], item['session_id']), None
+        except Exception as e:
+            return i, None, _batch_error_result(item['text'], e)
+    
+    def classify_each(prepared: List[Tuple[int, Tuple[str, str, Optional[Dict]]]]) -> List:
+        """Classify item by item, so a failing item only fails itself"""
+        classified = []
+        for i, (text, detected_language, context) in prepared:
+            try:
+                classified.append(intent_classifier.classify(text, detected_language, context))
+            except Exception as e:
+                classified.append(e)
+        return classified
+    
+    def build(i: int, stages: Tuple[str, str, Optional[Dict]], classification):
+        if isinstance(classification, Exception):
+            return i, _batch_error_result(items[i]['text'], classification)
+        text, detected_language, context = stages
+        intent, intent_confidence = classification
+        try:
+            response = _build_response(
+                text, detected_language, context, items[i]['session_id'],
+                intent, intent_confidence, start_times[i]
+            )
+            response_cache.put(cache_keys.get(i), response)
+            return i, response
+        except Exception as e:
+            return i, _batch_error_result(items[i]['text'], e)
+    
+    for wave in _session_waves(items):
+        # Serve cached items, normalize texts and merge session contexts
+        prepared = []
+        for i, stages, result in _map_wave(prepare, wave):
+            if result is not None:
+                yield i, result
+            else:
+                prepared.append((i, stages))
+        if not prepared:
+            continue
+        
+        # Classify intents together; if that fails, find the failing items one by one
+        try:
+            classified = intent_classifier.classify_batch(
+                [text for _, (text, _, _) in prepared],
+                [language for _, (_, language, _) in prepared],
+                [context for _, (_, _, context) in prepared]
+            )
+        except Exception as e:
+            logger.warning("Batch intent classification failed, classifying items one by one: %s", e)
+            classified = classify_each(prepared)
+        
+        # Extract entities and build responses
+        tasks = [(i, stages, classification) for (i, stages), classification in zip(prepared, classified)]
+        if len(tasks) == 1:
+            yield build(*tasks[0])
+        else:
+            futures = [_batch_pool.submit(build, *task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def parse_texts(items: List[Dict]) -> List[Dict]:
+    """
+    Parse several texts, classifying intents in batches
+    
+    Equivalent to calling parse_single_text for each item in order
+    (see iter_parse_texts).
+    
+    Args:
+        items: List of {"text", "context", "session_id"} dictionaries
+        
+    Returns:
+        Parsed result dictionaries in input order
+    """
+    results: List[Optional[Dict]] = [None] * len(items)
+    for i, result in iter_parse_texts(items):
+        results[i] = result
+    
+    return results
+
+
 def parse_pre_order(text: str, context: Optional[Dict] = None, session_id: Optional[str] = None) -> Dict:
     """
     Parse customer responses during pre-order substitution conversations
@@ -170,11 +492,8 @@ def parse_pre_order(text: str, context: Optional[Dict] = None, session_id: Optio
     Returns:
         Parsed result dictionary with pre-order metadata
     """
-    # Ensure conversation_stage is set
-    if context is None:
-        context = {}
-    context = context.copy()
-    context['conversation_stage'] = 'pre_order_substitution'
+    # Ensure conversation_stage is set (new dict, the caller's context is not modified)
+    context = {**context, 'conversation_stage': 'pre_order_substitution'} if context else {'conversation_stage': 'pre_order_substitution'}
     
     # Parse using base function
     response = parse_single_text(text, context, session_id)
@@ -210,43 +529,17 @@ def parse_post_delivery(text: str, context: Optional[Dict] = None, session_id: O
     Returns:
         Parsed result dictionary with post-delivery metadata
     """
-    # Ensure conversation_stage is set
-    if context is None:
-        context = {}
-    context = context.copy()
-    context['conversation_stage'] = 'post_delivery_investigation'
+    # Ensure conversation_stage is set (new dict, the caller's context is not modified)
+    context = {**context, 'conversation_stage': 'post_delivery_investigation'} if context else {'conversation_stage': 'post_delivery_investigation'}
     
     # Parse using base function with priority entities
-    start_time = time.time()
-    
-    # Normalize text
-    detected_language = language_detector.detect(text)
-    normalized_text = text_normalizer.normalize(text, detected_language)
-    
-    # Get session context if available
-    session_context = {}
-    if session_id:
-        session_context = session_manager.get_context(session_id)
-        if context:
-            context = {**session_context, **context}
-        else:
-            context = session_context
-    
-    text = normalized_text
-    
-    # Classify intent
-    intent, intent_confidence = intent_classifier.classify(text, detected_language, context)
-    
-    # Extract entities with priority for post-delivery (pass detected intent for context-aware sentiment)
     priority_entities = ['order_numbers', 'dates', 'reasons', 'products']
-    entities = entity_extractor.extract(text, detected_language, context, priority_entities=priority_entities, detected_intent=intent)
-    
-    # Apply confidence filters
-    filtered = apply_confidence_filters(intent, intent_confidence, entities)
+    response = parse_single_text(text, context, session_id, priority_entities=priority_entities)
+    entities = response['parameters']['entities']
     
     # Boost order_number from context if not extracted
-    if context.get('order_number') and not filtered['entities'].get('order_numbers'):
-        filtered['entities']['order_numbers'] = [{
+    if context.get('order_number') and not entities.get('order_numbers'):
+        entities['order_numbers'] = [{
             'value': str(context['order_number']),
             'confidence': 0.95,
             'source': 'context'
@@ -254,53 +547,110 @@ def parse_post_delivery(text: str, context: Optional[Dict] = None, session_id: O
     
     # Flag if order_number is missing for issue reports
     missing_order_warning = False
-    if intent == 'report_issue' and not filtered['entities'].get('order_numbers'):
+    if response['intent'] == 'report_issue' and not entities.get('order_numbers'):
         missing_order_warning = True
     
-    # Build response
-    response = {
-        'intent': intent,
-        'confidence': intent_confidence,
-        'parameters': {
-            'entities': filtered['entities'],
-            'language': detected_language,
-            'context': context or {}
-        },
-        'metadata': {
-            'conversation_stage': 'post_delivery_investigation',
-            'context_used': bool(context.get('order_number') or context.get('detected_discrepancy')),
-            'priority_entities': priority_entities,
-            'missing_order_warning': missing_order_warning
-        },
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'session_id': session_id,
-        'uncertain': filtered['uncertain'],
-        'processing_time_ms': int((time.time() - start_time) * 1000)
+    # Add post-delivery specific metadata
+    response['metadata'] = {
+        'conversation_stage': 'post_delivery_investigation',
+        'context_used': bool(context.get('order_number') or context.get('detected_discrepancy')),
+        'priority_entities': priority_entities,
+        'missing_order_warning': missing_order_warning
     }
     
-    # Add to session history
-    if session_id:
-        session_manager.add_to_history(session_id, intent, text, filtered['entities'])
+    return response
+
+
+def _validate_payload(data: Optional[Dict]) -> Tuple[str, Dict, Optional[str]]:
+    """
+    Validate a single-text request body
     
-    logger.info(
-        f"Post-delivery parsed intent: {intent} (confidence: {intent_confidence:.2f}, "
-        f"time: {response['processing_time_ms']}ms, session: {session_id})"
-    )
+    Args:
+        data: Request body
+        
+    Returns:
+        Tuple of (text, context, session_id)
+        
+    Raises:
+        ValidationError: If any field is invalid
+    """
+    if not data:
+        raise ValidationError("Request body is required", "MISSING_BODY")
     
-    return response
+    # Validate text
+    text, error = validate_text(data.get('text'))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    # Validate context
+    context, error = validate_context(data.get('context'))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    # Validate session_id
+    session_id, error = validate_session_id(data.get('session_id'))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    return text, context, session_id
+
+
+def _validate_batch_payload(data: Optional[Dict]) -> List[Dict]:
+    """
+    Validate a batch request body
+    
+    Accepts either {"texts": [...], "context": {...}, "session_id": "..."} where
+    context and session_id are shared by all texts, or {"items": [{"text": ...,
+    "context": ..., "session_id": ...}, ...]} with per-item context and session.
+    
+    Args:
+        data: Request body
+        
+    Returns:
+        List of {"text", "context", "session_id"} dictionaries
+        
+    Raises:
+        ValidationError: If the batch or any item is invalid
+    """
+    if not data:
+        raise ValidationError("Request body is required", "MISSING_BODY")
+    
+    if 'items' in data:
+        # Validate per-item payloads
+        items, error = validate_batch_items(data.get('items'))
+        if error:
+            raise ValidationError(error.message, error.error_code)
+        return items
+    
+    # Validate texts
+    texts, error = validate_batch_request(data.get('texts', []))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    # Validate context (applied to all)
+    context, error = validate_context(data.get('context'))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    # Validate session_id
+    session_id, error = validate_session_id(data.get('session_id'))
+    if error:
+        raise ValidationError(error.message, error.error_code)
+    
+    return [{'text': text, 'context': context, 'session_id': session_id} for text in texts]
 
 
 @app.errorhandler(NLUError)
 def handle_nlu_error(error: NLUError):
     """Handle NLU errors"""
-    logger.warning(f"NLU Error: {error.error_code} - {error.message}")
+    logger.warning("NLU Error: %s - %s", error.error_code, error.message)
     return jsonify(error.to_dict()), error.status_code
 
 
 @app.errorhandler(Exception)
 def handle_generic_error(e: Exception):
     """Handle unexpected errors"""
-    logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+    logger.error("Unexpected error: %s", e, exc_info=True)
     error = InternalError("An unexpected error occurred", details={'type': type(e).__name__})
     return jsonify(error.to_dict()), error.status_code
 
@@ -311,7 +661,11 @@ def root():
     return jsonify({
         'service': 'nlu-parser',
         'message': 'NLU Parser API is running. Try /health or POST /nlu/parse.',
-        'routes': ['/health', '/nlu/parse', '/nlu/pre-parse', '/nlu/post-parse', '/nlu/parse/batch']
+        'routes': [
+            '/health', '/nlu/parse', '/nlu/pre-parse', '/nlu/post-parse',
+            '/nlu/parse/batch', '/nlu/pre-parse/batch', '/nlu/post-parse/batch',
+            '/nlu/parse/batch/stream'
+        ]
     }), 200
 
 
@@ -320,7 +674,7 @@ def health():
     """Enhanced health check endpoint"""
     try:
         # Check components
-        catalog_loaded = len(product_catalog.get_catalog()) > 0
+        product_count = product_catalog.count
         
         health_data = {
             'status': 'healthy',
@@ -331,9 +685,10 @@ def health():
                 'language_detector': True,
                 'intent_classifier': True,
                 'entity_extractor': True,
-                'product_catalog': catalog_loaded,
-                'product_count': len(product_catalog.get_catalog()),
-                'semantic_classifier': intent_classifier.semantic_classifier.is_available() if hasattr(intent_classifier, 'semantic_classifier') and intent_classifier.semantic_classifier else False
+                'product_catalog': product_count > 0,
+                'product_count': product_count,
+                # Built on the first semantic fallback; the health check must not trigger that
+                'semantic_classifier': intent_classifier.semantic_classifier_loaded
             },
             'config': {
                 'session_enabled': config.get('session.enabled', True),
@@ -354,7 +709,7 @@ def health():
         return jsonify(health_data), status_code
         
     except Exception as e:
-        logger.error(f"Health check error: {e}", exc_info=True)
+        logger.error("Health check error: %s", e, exc_info=True)
         return jsonify({
             'status': 'unhealthy',
             'error': str(e)
@@ -385,25 +740,7 @@ def parse():
     }
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            raise ValidationError("Request body is required", "MISSING_BODY")
-        
-        # Validate text
-        text, error = validate_text(data.get('text'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate context
-        context, error = validate_context(data.get('context'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate session_id
-        session_id, error = validate_session_id(data.get('session_id'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+        text, context, session_id = _validate_payload(request.get_json())
         
         # Parse text
         response = parse_single_text(text, context, session_id)
@@ -413,7 +750,7 @@ def parse():
     except ValidationError as e:
         raise  # Will be handled by error handler
     except Exception as e:
-        logger.error(f"Error parsing text: {str(e)}", exc_info=True)
+        logger.error("Error parsing text: %s", e, exc_info=True)
         raise InternalError("Failed to parse text", details={'error': str(e)})
 
 
@@ -443,25 +780,7 @@ def pre_parse():
     Response includes metadata with conversation_stage and priority_entities
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            raise ValidationError("Request body is required", "MISSING_BODY")
-        
-        # Validate text
-        text, error = validate_text(data.get('text'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate context
-        context, error = validate_context(data.get('context'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate session_id
-        session_id, error = validate_session_id(data.get('session_id'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+        text, context, session_id = _validate_payload(request.get_json())
         
         # Parse text with pre-order context
         response = parse_pre_order(text, context, session_id)
@@ -471,7 +790,7 @@ def pre_parse():
     except ValidationError as e:
         raise  # Will be handled by error handler
     except Exception as e:
-        logger.error(f"Error parsing pre-order text: {str(e)}", exc_info=True)
+        logger.error("Error parsing pre-order text: %s", e, exc_info=True)
         raise InternalError("Failed to parse pre-order text", details={'error': str(e)})
 
 
@@ -503,25 +822,7 @@ def post_parse():
     Response includes metadata with conversation_stage, priority_entities, and missing_order_warning
     """
     try:
-        data = request.get_json()
-        
-        if not data:
-            raise ValidationError("Request body is required", "MISSING_BODY")
-        
-        # Validate text
-        text, error = validate_text(data.get('text'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate context
-        context, error = validate_context(data.get('context'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
-        
-        # Validate session_id
-        session_id, error = validate_session_id(data.get('session_id'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+        text, context, session_id = _validate_payload(request.get_json())
         
         # Parse text with post-delivery context
         response = parse_post_delivery(text, context, session_id)
@@ -531,10 +832,73 @@ def post_parse():
     except ValidationError as e:
         raise  # Will be handled by error handler
     except Exception as e:
-        logger.error(f"Error parsing post-delivery text: {str(e)}", exc_info=True)
+        logger.error("Error parsing post-delivery text: %s", e, exc_info=True)
         raise InternalError("Failed to parse post-delivery text", details={'error': str(e)})
 
 
+def _batch_error_result(text: str, error: Exception) -> Dict:
+    """Build the result for a batch item that failed to parse"""
+    return {
+        'error': str(error),
+        'text': text[:100],
+        'intent': 'unknown',
+        'confidence': 0.0
+    }
+
+
+def _parse_items(items: List[Dict], parse_fn: Callable) -> List[Dict]:
+    """
+    Parse batch items with parse_fn on the batch thread pool
+    
+    Args:
+        items: List of {"text", "context", "session_id"} dictionaries
+        parse_fn: One of parse_single_text, parse_pre_order, parse_post_delivery
+        
+    Returns:
+        Parsed result dictionaries in input order
+    """
+    results: List[Optional[Dict]] = [None] * len(items)
+    
+    def parse_item(i: int):
+        item = items[i]
+        try:
+            results[i] = parse_fn(item['text'], item['context'], item['session_id'])
+        except Exception as e:
+            # Add error result instead of failing entire batch
+            results[i] = _batch_error_result(item['text'], e)
+    
+    for wave in _session_waves(items):
+        _map_wave(parse_item, wave)
+    
+    return results
+
+
+def _parse_batch_request(data: Optional[Dict], batch_fn: Callable[[List[Dict]], List[Dict]]) -> Dict:
+    """
+    Validate a batch request body and parse its items with batch_fn
+    
+    Args:
+        data: Request body (see _validate_batch_payload)
+        batch_fn: Callable taking the validated items and returning their results
+        
+    Returns:
+        Batch response dictionary
+    """
+    items = _validate_batch_payload(data)
+    
+    # Parse all items
+    start_time = time.time()
+    results = batch_fn(items)
+    
+    processing_time = int((time.time() - start_time) * 1000)
+    
+    return {
+        'results': results,
+        'count': len(results),
+        'processing_time_ms': processing_time
+    }
+
+
 @app.route('/nlu/parse/batch', methods=['POST'])
 def parse_batch():
     """
@@ -547,6 +911,11 @@ def parse_batch():
         "session_id": "string" (optional)
     }
     
+    or, with per-item context and session:
+    {
+        "items": [{"text": "...", "context": {...}, "session_id": "..."}, ...] (required, max 100)
+    }
+    
     Response:
     {
         "results": [
@@ -562,57 +931,100 @@ def parse_batch():
     }
     """
     try:
-        data = request.get_json()
+        response = _parse_batch_request(request.get_json(), parse_texts)
         
-        if not data:
-            raise ValidationError("Request body is required", "MISSING_BODY")
+        return jsonify(response), 200
         
-        # Validate texts
-        texts, error = validate_batch_request(data.get('texts', []))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+    except ValidationError as e:
+        raise
+    except Exception as e:
+        logger.error("Error parsing batch: %s", e, exc_info=True)
+        raise InternalError("Failed to parse batch", details={'error': str(e)})
+
+
+@app.route('/nlu/parse/batch/stream', methods=['POST'])
+def parse_batch_stream():
+    """
+    Parse multiple texts and stream results as newline-delimited JSON
+    
+    Request body matches /nlu/parse/batch. Each result is written as soon as
+    it is ready, so lines may arrive out of request order:
+    
+        {"index": 0, "result": {"intent": "string", "confidence": float, ...}}
+        ...
+        {"count": int, "processing_time_ms": int}
+    
+    The last line summarizes the batch. A failing item gets an error result
+    line like any other; if the stream itself fails after the response has
+    started, the summary line carries an "error" key instead and count is
+    the number of results sent.
+    """
+    try:
+        items = _validate_batch_payload(request.get_json())
         
-        # Validate context (applied to all)
-        context, error = validate_context(data.get('context'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+    except ValidationError as e:
+        raise
+    except Exception as e:
+        logger.error("Error parsing batch stream: %s", e, exc_info=True)
+        raise InternalError("Failed to parse batch", details={'error': str(e)})
+    
+    def generate():
+        start_time = time.time()
+        count = 0
+        summary = {}
+        try:
+            for i, result in iter_parse_texts(items):
+                count += 1
+                yield app.json.dumps({'index': i, 'result': result}) + '\n'
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error("Error streaming batch: %s", e, exc_info=True)
+            summary['error'] = 'Failed to parse batch'
+        summary['count'] = count
+        summary['processing_time_ms'] = int((time.time() - start_time) * 1000)
+        yield app.json.dumps(summary) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/nlu/pre-parse/batch', methods=['POST'])
+def pre_parse_batch():
+    """
+    Parse multiple pre-order substitution responses in a single request
+    
+    Request body and response match /nlu/parse/batch; each result carries
+    the pre-order metadata returned by /nlu/pre-parse.
+    """
+    try:
+        response = _parse_batch_request(request.get_json(), partial(_parse_items, parse_fn=parse_pre_order))
         
-        # Validate session_id
-        session_id, error = validate_session_id(data.get('session_id'))
-        if error:
-            raise ValidationError(error.message, error.error_code)
+        return jsonify(response), 200
         
-        # Parse all texts
-        start_time = time.time()
-        results = []
-        for text in texts:
-            try:
-                result = parse_single_text(text, context, session_id)
-                results.append(result)
-            except Exception as e:
-                # Add error result instead of failing entire batch
-                results.append({
-                    'error': str(e),
-                    'text': text[:100],
-                    'intent': 'unknown',
-                    'confidence': 0.0
-                })
-        
-        processing_time = int((time.time() - start_time) * 1000)
-        
-        response = {
-            'results': results,
-            'count': len(results),
-            'processing_time_ms': processing_time
-        }
+    except ValidationError as e:
+        raise
+    except Exception as e:
+        logger.error("Error parsing pre-order batch: %s", e, exc_info=True)
+        raise InternalError("Failed to parse pre-order batch", details={'error': str(e)})
+
+
+@app.route('/nlu/post-parse/batch', methods=['POST'])
+def post_parse_batch():
+    """
+    Parse multiple post-delivery responses in a single request
+    
+    Request body and response match /nlu/parse/batch; each result carries
+    the post-delivery metadata returned by /nlu/post-parse.
+    """
+    try:
+        response = _parse_batch_request(request.get_json(), partial(_parse_items, parse_fn=parse_post_delivery))
         
         return jsonify(response), 200
         
     except ValidationError as e:
         raise
     except Exception as e:
-        logger.error(f"Error parsing batch: {str(e)}", exc_info=True)
-        raise InternalError("Failed to parse batch", details={'error': str(e)})
+        logger.error("Error parsing post-delivery batch: %s", e, exc_info=True)
+        raise InternalError("Failed to parse post-delivery batch", details={'error': str(e)})
 
 
 @app.route('/nlu/session/<session_id>', methods=['GET'])
@@ -636,7 +1048,7 @@ def get_session(session_id: str):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error getting session: {e}", exc_info=True)
+        logger.error("Error getting session: %s", e, exc_info=True)
         raise InternalError("Failed to get session", details={'error': str(e)})
 
 
@@ -651,14 +1063,43 @@ def delete_session(session_id: str):
         }), 200
         
     except Exception as e:
-        logger.error(f"Error deleting session: {e}", exc_info=True)
+        logger.error("Error deleting session: %s", e, exc_info=True)
         raise InternalError("Failed to delete session", details={'error': str(e)})
 
 
+def warm_up(include_semantic: bool = False):
+    """
+    Run sample texts through the pipeline so lazy initialization
+    (sentiment analyzer, catalog index, regex caches) happens at startup
+    instead of on the first request
+    
+    Results bypass the response cache. The semantic fallback stays lazy
+    (built on first use) unless include_semantic is set.
+    
+    Args:
+        include_semantic: Also classify with the semantic fallback, building it now
+    """
+    start_time = time.time()
+    classify = intent_classifier.classify if include_semantic else intent_classifier.classify_rules
+    for text in ('warmup', 'hello', 'yes', 'my milk was missing from order 12345678'):
+        try:
+            text, detected_language, context = _prepare_text(text, None, None)
+            intent, _ = classify(text, detected_language, context)
+            entity_extractor.extract(text, detected_language, context, detected_intent=intent)
+        except Exception as e:
+            logger.warning("Warm-up parse failed for %r: %s", text, e)
+    logger.info("Warm-up finished in %dms", (time.time() - start_time) * 1000)
+
+
+# With gunicorn's preload_app this runs once in the master and is shared by workers
+if config.get('nlu.warmup', True):
+    warm_up(include_semantic=config.get('nlu.warmup_semantic', False))
+
+
 if __name__ == '__main__':
     host = config.get('api.host', '0.0.0.0')
     port = config.get('api.port', 6060)
     debug = config.get('api.debug', False)
     
-    logger.info(f"Starting NLU Parser API on {host}:{port} (debug={debug})")
+    logger.info("Starting NLU Parser API on %s:%s (debug=%s)", host, port, debug)
     app.run(host=host, port=port, debug=debug)
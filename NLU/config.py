@@ -3,9 +3,10 @@ Configuration management for NLU Parser
 Supports environment variables and config file
 """
 
+import copy
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 # Default configuration
 DEFAULT_CONFIG = {
@@ -13,6 +14,7 @@ DEFAULT_CONFIG = {
         'host': '0.0.0.0',
         'port': 6060,
         'debug': False,
+        'batch_workers': None,  # Threads for batch parsing (None: min(8, CPU count))
     },
     'cors': {
         'enabled': True,
@@ -32,6 +34,8 @@ DEFAULT_CONFIG = {
         'use_semantic_fallback': True,
         'semantic_threshold': 0.5,  # Use semantic if rule-based confidence < this
         'semantic_weight': 0.8,  # Weight for semantic scores vs rule scores
+        'warmup': True,  # Run sample texts through the pipeline at startup
+        'warmup_semantic': False,  # Also build the semantic fallback during warm-up (otherwise on first use)
     },
     'product_matching': {
         'fuzzy_threshold': 0.7,
@@ -42,6 +46,14 @@ DEFAULT_CONFIG = {
         'max_history': 10,
         'ttl_seconds': 3600,  # 1 hour
     },
+    'cache': {
+        'enabled': True,  # Cache responses for repeated utterances without a session
+        'max_size': 10000,
+        'ttl_seconds': 300,
+        'entity_max_size': 1024,  # Memoized sentiment/negation/urgency results per extractor (0 disables)
+        'intent_max_size': 1024,  # Memoized rule-based intent scores per classifier (0 disables)
+        'semantic_max_size': 1024,  # Memoized semantic fallback results per classifier (0 disables)
+    },
     'logging': {
         'level': 'INFO',
         'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -62,10 +74,34 @@ class Config:
         Args:
             config_file: Optional path to config file (JSON/YAML)
         """
-        self._config = DEFAULT_CONFIG.copy()
+        # Deep copy so env overrides don't leak into DEFAULT_CONFIG
+        self._config = copy.deepcopy(DEFAULT_CONFIG)
         self._load_from_env()
         if config_file:
             self._load_from_file(config_file)
+        
+        # Config is fixed after loading, so resolve every dot path once
+        self._flat = self._flatten(self._config)
+    
+    @staticmethod
+    def _flatten(config: Dict, prefix: str = '') -> Dict[str, Any]:
+        """
+        Map every dot-separated path (sections and leaves) to its value
+        
+        Args:
+            config: Nested configuration dictionary
+            prefix: Path prefix for nested sections
+            
+        Returns:
+            Flat dictionary, e.g. {'api': {...}, 'api.port': 6060, ...}
+        """
+        flat = {}
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(Config._flatten(value, f"{path}."))
+        return flat
     
     def _load_from_env(self):
         """Load configuration from environment variables"""
@@ -76,6 +112,8 @@ class Config:
             self._config['api']['port'] = int(os.getenv('NLU_PORT'))
         if os.getenv('NLU_DEBUG'):
             self._config['api']['debug'] = os.getenv('NLU_DEBUG').lower() == 'true'
+        if os.getenv('NLU_BATCH_WORKERS'):
+            self._config['api']['batch_workers'] = int(os.getenv('NLU_BATCH_WORKERS'))
         
         # CORS config
         if os.getenv('NLU_CORS_ORIGINS'):
@@ -101,6 +139,16 @@ class Config:
             self._config['nlu']['semantic_threshold'] = float(os.getenv('NLU_SEMANTIC_THRESHOLD'))
         if os.getenv('NLU_SEMANTIC_WEIGHT'):
             self._config['nlu']['semantic_weight'] = float(os.getenv('NLU_SEMANTIC_WEIGHT'))
+        if os.getenv('NLU_WARMUP'):
+            self._config['nlu']['warmup'] = os.getenv('NLU_WARMUP').lower() == 'true'
+        if os.getenv('NLU_WARMUP_SEMANTIC'):
+            self._config['nlu']['warmup_semantic'] = os.getenv('NLU_WARMUP_SEMANTIC').lower() == 'true'
+        
+        # Response cache config
+        if os.getenv('NLU_CACHE_ENABLED'):
+            self._config['cache']['enabled'] = os.getenv('NLU_CACHE_ENABLED').lower() == 'true'
+        if os.getenv('NLU_CACHE_MAX_SIZE'):
+            self._config['cache']['max_size'] = int(os.getenv('NLU_CACHE_MAX_SIZE'))
     
     def _load_from_file(self, config_file: str):
         """Load configuration from file (future: support JSON/YAML)"""
@@ -118,14 +166,7 @@ class Config:
         Returns:
             Config value or default
         """
-        keys = key_path.split('.')
-        value = self._config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        return self._flat.get(key_path, default)
     
     def get_all(self) -> Dict:
         """Get all configuration"""
@@ -7,6 +7,9 @@ from typing import Dict, Optional
 
 class NLUError(Exception):
     """Base NLU error"""
+    # Slots keep the four fields out of the lazily created instance __dict__
+    __slots__ = ('message', 'error_code', 'status_code', 'details')
+    
     def __init__(self, message: str, error_code: str, status_code: int = 400, details: Optional[Dict] = None):
         self.message = message
         self.error_code = error_code
@@ -25,18 +28,24 @@ class NLUError(Exception):
 
 class ValidationError(NLUError):
     """Validation error"""
+    __slots__ = ()
+    
     def __init__(self, message: str, error_code: str, details: Optional[Dict] = None):
         super().__init__(message, error_code, 400, details)
 
 
 class ParseError(NLUError):
     """Parsing error"""
+    __slots__ = ()
+    
     def __init__(self, message: str, error_code: str = 'PARSE_ERROR', details: Optional[Dict] = None):
         super().__init__(message, error_code, 422, details)
 
 
 class InternalError(NLUError):
     """Internal server error"""
+    __slots__ = ()
+    
     def __init__(self, message: str, error_code: str = 'INTERNAL_ERROR', details: Optional[Dict] = None):
         super().__init__(message, error_code, 500, details)
 
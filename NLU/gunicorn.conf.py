@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for the NLU Parser API
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+from config import config as nlu_config  # "config" is itself a gunicorn setting
+
+bind = f"{nlu_config.get('api.host', '0.0.0.0')}:{nlu_config.get('api.port', 6060)}"
+
+# Sessions live in process memory, so several workers would split a
+# conversation's history across processes. Use one worker while sessions
+# are enabled unless NLU_WORKERS says otherwise.
+if nlu_config.get('session.enabled', True):
+    _default_workers = 1
+else:
+    _default_workers = 2 * (os.cpu_count() or 1) + 1
+
+workers = int(os.getenv('NLU_WORKERS', _default_workers))
+worker_class = 'gthread'
+threads = int(os.getenv('NLU_THREADS', 4))
+
+# Load classifiers and the product catalog once in the master and share
+# them with forked workers
+preload_app = True
+
+timeout = 30
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+loglevel = nlu_config.get('logging.level', 'INFO').lower()
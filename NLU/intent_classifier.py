@@ -3,17 +3,19 @@ Intent Classification Module
 Classifies user intent from text using rule-based patterns
 """
 
+import logging
 import re
-from typing import Dict, Optional, Tuple
-
-from config import config
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 try:
-    from semantic_intent_classifier import SemanticIntentClassifier
-    SEMANTIC_AVAILABLE = True
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    SEMANTIC_AVAILABLE = False
-    SemanticIntentClassifier = None
+    AHOCORASICK_AVAILABLE = False
+
+from config import config
 
 
 class IntentClassifier:
@@ -157,15 +159,15 @@ class IntentClassifier:
         },
         'greeting': {
             'en': [
-                r'\b^(hello|hi|hey|good morning|good afternoon|good evening|greetings)\b',
+                r'^(hello|hi|hey|good morning|good afternoon|good evening|greetings)\b',
                 r'\b(hello|hi|hey)\b.*\b(there|you)\b'
             ],
             'fi': [
-                r'\b^(hei|moi|terve|hyvää päivää|päivää|iltaa)\b',
+                r'^(hei|moi|terve|hyvää päivää|päivää|iltaa)\b',
                 r'\b(hei|moi|terve)\b.*\b(siellä|sinä)\b'
             ],
             'sv': [
-                r'\b^(hej|hallå|god morgon|god eftermiddag|god kväll|hälsningar)\b',
+                r'^(hej|hallå|god morgon|god eftermiddag|god kväll|hälsningar)\b',
                 r'\b(hej|hallå)\b.*\b(där|du)\b'
             ]
         },
@@ -263,28 +265,302 @@ class IntentClassifier:
         }
     }
     
+    # Phrases behind the per-intent score adjustments
+    CALLBACK_PHRASES = ('speak to', 'talk to', 'need to speak', 'want to speak', 'someone', 'human', 'person', 'agent')
+    DISCREPANCY_PHRASES = (
+        'only', 'not', 'should be', 'expected', 'but got', 'but received',
+        'instead of', 'quantity', 'amount', 'number'
+    )
+    ISSUE_PHRASES = ('there is no', "there's no", 'there are no', 'not in my order', 'missing from my order', 'in my order there is no')
+    TIME_WORDS = ('tomorrow', 'today', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday', 'next week')
+    NEED_WORDS = ('need', 'want', 'have to', 'must', 'should', 'get', 'receive')
+    
+    # Score multipliers for intents that fit the conversation stage
+    STAGE_MULTIPLIERS = {
+        'pre_order_substitution': {
+            'confirm_substitution': 1.8,
+            'reject_substitution': 1.8,
+            'query_substitution': 1.5,
+        },
+        'post_delivery_investigation': {
+            'report_issue': 1.8,
+            'confirm_delivery': 1.5,
+            'query_order_status': 1.5,
+        },
+    }
+    # Score multipliers when the context offers a solution/substitution to accept or reject
+    SOLUTION_MULTIPLIERS = {'confirm_substitution': 1.5, 'reject_substitution': 1.5}
+    # Bare replies that settle a pre-order substitution
+    YES_REPLIES = frozenset({'yes', 'yeah', 'yep', 'ok', 'okay', 'sure'})
+    NO_REPLIES = frozenset({'no', 'nope', 'nah'})
+    # Post-delivery phrases that point to a reported issue
+    ISSUE_INDICATORS = (
+        "didn't receive", "did not receive", "not receive", "missing", "didn't get",
+        "there is no", "there's no", "not in my order", "missing from my order"
+    )
+    
+    # Negation words by language
+    NEGATION_WORDS = {
+        'en': ['no', 'not', "don't", "doesn't", "didn't", "won't", "can't", "couldn't", "shouldn't", "wouldn't", "isn't", "aren't", "wasn't", "weren't", 'never', 'nothing', 'nobody',
+               'nope', 'none', 'nowhere', 'nor', 'cannot'],
+        'fi': ['ei', 'en', 'et', 'emme', 'ette', 'eivät', 'ei ole', 'ei ollut', 'ei koskaan', 'eikä'],
+        'sv': ['inte', 'ej', 'nej', 'aldrig', 'ingenting', 'ingen', 'är inte', 'var inte']
+    }
+    
     def __init__(self):
         """Initialize intent classifier"""
-        # Compile patterns for performance
+        # Compile patterns for performance. Text is matched lowercased, so no IGNORECASE
+        # (Unicode case folding on every character); ASCII text gets ASCII-mode twins with
+        # cheaper \b, and identical matches since no pattern uses \s
         self.compiled_patterns = {}
+        self.compiled_unions = {}
+        self._ascii_patterns = {}
+        self._ascii_unions = {}
         for intent, lang_patterns in self.INTENT_PATTERNS.items():
-            self.compiled_patterns[intent] = {}
-            for lang, patterns in lang_patterns.items():
-                self.compiled_patterns[intent][lang] = [
-                    re.compile(pattern, re.IGNORECASE) for pattern in patterns
+            for patterns_by_intent, unions_by_intent, flags in (
+                (self.compiled_patterns, self.compiled_unions, 0),
+                (self._ascii_patterns, self._ascii_unions, re.ASCII),
+            ):
+                patterns_by_intent[intent] = {
+                    lang: [re.compile(self._linear_gaps(pattern), flags) for pattern in patterns]
+                    for lang, patterns in lang_patterns.items()
+                }
+                # One alternation per (intent, language): most intents match nothing, and one scan settles that
+                unions_by_intent[intent] = {
+                    lang: re.compile('|'.join(f'(?:{self._linear_gaps(pattern)})' for pattern in patterns), flags)
+                    for lang, patterns in lang_patterns.items()
+                }
+        
+        # Per language, (intent, patterns, union) rows in INTENT_PATTERNS order with the English
+        # fallback already resolved, for ASCII (True) and other text (False)
+        self._intent_rules: Dict[bool, Dict[str, List[Tuple[str, List[re.Pattern], Optional[re.Pattern]]]]] = {}
+        for is_ascii, patterns_by_intent, unions_by_intent in (
+            (False, self.compiled_patterns, self.compiled_unions),
+            (True, self._ascii_patterns, self._ascii_unions),
+        ):
+            self._intent_rules[is_ascii] = {
+                lang: [
+                    (intent, lang_patterns.get(lang, lang_patterns.get('en', [])),
+                     unions_by_intent[intent].get(lang, unions_by_intent[intent].get('en')))
+                    for intent, lang_patterns in patterns_by_intent.items()
                 ]
+                for lang in {lang for lang_patterns in self.INTENT_PATTERNS.values() for lang in lang_patterns}
+            }
+        
+        # Every pattern opens with a group of words; one of them must occur for the pattern to match.
+        # Per language, map those literals to their intents so one pass over the text picks the
+        # intents worth running regexes for (intents with a pattern not opening with words always run)
+        self.intent_literals: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        self.unfiltered_intents: Dict[str, FrozenSet[str]] = {}
+        for lang in {lang for lang_patterns in self.INTENT_PATTERNS.values() for lang in lang_patterns}:
+            literals = {}
+            unfiltered = set()
+            for intent, lang_patterns in self.INTENT_PATTERNS.items():
+                intent_literals = set()
+                for pattern in lang_patterns.get(lang, lang_patterns.get('en', [])):
+                    required = self._required_literals(pattern)
+                    if required is None:
+                        unfiltered.add(intent)
+                        break
+                    intent_literals.update(required)
+                else:
+                    # A literal containing a shorter one adds nothing: drop it
+                    literals[intent] = tuple(sorted(
+                        (literal for literal in intent_literals
+                         if not any(other != literal and other in literal for other in intent_literals)),
+                        key=len
+                    ))
+            self.intent_literals[lang] = literals
+            self.unfiltered_intents[lang] = frozenset(unfiltered)
+        # With pyahocorasick, one automaton pass per language finds every literal occurrence
+        self._literal_automata: Optional[Dict[str, 'ahocorasick.Automaton']] = None
+        if AHOCORASICK_AVAILABLE:
+            self._literal_automata = {}
+            for lang, literals in self.intent_literals.items():
+                literal_intents: Dict[str, set] = {}
+                for intent, intent_literals in literals.items():
+                    for literal in intent_literals:
+                        literal_intents.setdefault(literal, set()).add(intent)
+                automaton = ahocorasick.Automaton()
+                for literal, intents in literal_intents.items():
+                    automaton.add_word(literal, frozenset(intents))
+                automaton.make_automaton()
+                self._literal_automata[lang] = automaton
+        
+        self._number_re = re.compile(r'\b\d+\b')
+        
+        # Whole negation words only ("no" must not fire on "now" or "know"); one scan of lowercase text per language
+        self._negation_res = {
+            lang: re.compile(r'\b(?:' + '|'.join(re.escape(word) for word in words) + r')\b')
+            for lang, words in self.NEGATION_WORDS.items()
+        }
         
-        # Initialize semantic classifier if available and enabled
-        self.semantic_classifier = None
-        if SEMANTIC_AVAILABLE and config.get('nlu.use_semantic_fallback', True):
-            try:
-                self.semantic_classifier = SemanticIntentClassifier()
-                if not self.semantic_classifier.is_available():
-                    self.semantic_classifier = None
-            except Exception as e:
-                import logging
-                logging.warning(f"Failed to initialize semantic classifier: {e}")
-                self.semantic_classifier = None
+        # Memoize rule scoring on lowercase text, language and the three context facts that
+        # affect scores; short replies ("yes", "no", "thanks") repeat across sessions
+        self._cached_rule_scores = lru_cache(maxsize=config.get('cache.intent_max_size', 1024))(self._score_rules)
+        
+        # The semantic classifier (scikit-learn import and TF-IDF fit) is built on first use;
+        # see the semantic_classifier property
+        self._semantic_classifier = None
+        self._semantic_failed = False
+        self._semantic_lock = Lock()
+    
+    @property
+    def semantic_classifier(self):
+        """
+        Semantic fallback classifier, imported and built on first access
+        
+        Returns:
+            SemanticIntentClassifier, or None if disabled or unavailable
+        """
+        if self._semantic_classifier is not None or self._semantic_failed:
+            return self._semantic_classifier
+        if not config.get('nlu.use_semantic_fallback', True):
+            return None
+        
+        with self._semantic_lock:
+            if self._semantic_classifier is None and not self._semantic_failed:
+                try:
+                    from semantic_intent_classifier import SemanticIntentClassifier
+                    semantic_classifier = SemanticIntentClassifier()
+                    if semantic_classifier.is_available():
+                        self._semantic_classifier = semantic_classifier
+                    else:
+                        self._semantic_failed = True
+                except Exception as e:
+                    logging.warning(f"Failed to initialize semantic classifier: {e}")
+                    # Don't retry the import and fit on every low-confidence call
+                    self._semantic_failed = True
+        return self._semantic_classifier
+    
+    @property
+    def semantic_classifier_loaded(self) -> bool:
+        """Whether the semantic classifier has been built, without building it"""
+        return self._semantic_classifier is not None
+    
+    @staticmethod
+    def _linear_gaps(pattern: str) -> str:
+        """
+        Rewrite a pattern's top-level ".*" gaps so matching stays linear in the text length
+        
+        "a.*b.*c" backtracks through every combination of gap lengths when "c" is missing,
+        which takes seconds on a few hundred repeated words. Each gap becomes an atomic lazy
+        scan to the nearest next part, "a(?>.*?b)(?>.*?c)": taking the earliest "b" leaves the
+        most room for "c", so the rewrite matches the same texts. A trailing ".*" keeps findall
+        at one match per line, like the greedy original.
+        
+        Args:
+            pattern: Regex pattern string
+            
+        Returns:
+            Equivalent pattern without backtracking between gaps
+        """
+        parts = []
+        start = 0
+        depth = 0
+        i = 0
+        while i < len(pattern):
+            ch = pattern[i]
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+            elif depth == 0 and pattern.startswith('.*', i):
+                parts.append(pattern[start:i])
+                i += 2
+                start = i
+                continue
+            i += 1
+        if not parts:
+            return pattern
+        parts.append(pattern[start:])
+        return parts[0] + ''.join(f'(?>.*?{part})' for part in parts[1:]) + '.*'
+    
+    @staticmethod
+    def _required_literals(pattern: str) -> Optional[List[str]]:
+        """
+        Find literals one of which must occur in any text the pattern matches
+        
+        Looks at the group the pattern opens with (after word-boundary and ^ anchors)
+        and takes the literal prefix of each alternative, e.g. "i'?ll take" gives "i".
+        
+        Args:
+            pattern: Regex pattern string
+            
+        Returns:
+            List of literals, or None if the pattern does not open with a group of words
+        """
+        body = pattern
+        while body.startswith(('\\b', '^')):
+            body = body[2:] if body.startswith('\\b') else body[1:]
+        if not body.startswith('('):
+            return None
+        
+        # Split the opening group into its top-level alternatives
+        alternatives = []
+        current = ''
+        depth = 0
+        i = 1
+        while i < len(body):
+            ch = body[i]
+            if ch == '\\':
+                current += body[i:i + 2]
+                i += 2
+                continue
+            if ch == '(':
+                depth += 1
+            elif ch == ')':
+                if depth == 0:
+                    break
+                depth -= 1
+            elif ch == '|' and depth == 0:
+                alternatives.append(current)
+                current = ''
+                i += 1
+                continue
+            current += ch
+            i += 1
+        alternatives.append(current)
+        
+        literals = []
+        for alternative in alternatives:
+            prefix = ''
+            for j, ch in enumerate(alternative):
+                # Stop at regex syntax, and before a character a quantifier makes optional or repeats
+                if ch in '\\.^$*+?{}[]()|' or alternative[j + 1:j + 2] in ('?', '*', '+', '{'):
+                    break
+                prefix += ch
+            if not prefix:
+                return None
+            literals.append(prefix)
+        return literals
+    
+    def _candidate_intents(self, text_lower: str, language: str) -> FrozenSet[str]:
+        """
+        Find the intents whose patterns could match the text
+        
+        Args:
+            text_lower: Lowercase input text
+            language: Detected language
+            
+        Returns:
+            Intents with a required literal in the text, plus those that cannot be filtered
+        """
+        if language not in self.intent_literals:
+            language = 'en'
+        
+        candidates = set(self.unfiltered_intents[language])
+        if self._literal_automata is not None:
+            for _, intents in self._literal_automata[language].iter(text_lower):
+                candidates.update(intents)
+        else:
+            for intent, literals in self.intent_literals[language].items():
+                if any(literal in text_lower for literal in literals):
+                    candidates.add(intent)
+        return frozenset(candidates)
     
     def classify(self, text: str, language: str, context: Optional[Dict] = None) -> Tuple[str, float]:
         """
@@ -301,28 +577,158 @@ class IntentClassifier:
         if not text:
             return 'unknown', 0.0
         
-        text_lower = text.lower()
-        intent_scores: Dict[str, float] = {}
+        rule_based_intent, rule_based_confidence, rule_based_scores = self._classify_rules(text, language, context)
+        
+        # Hybrid approach: Use semantic similarity as fallback
+        if self._needs_semantic(rule_based_intent, rule_based_confidence):
+            semantic_results = self.semantic_classifier.classify(text, language, top_k=3)
+            return self._combine_with_semantic(rule_based_intent, rule_based_confidence, rule_based_scores, semantic_results)
+        
+        # Return rule-based result (or unknown if no scores)
+        return rule_based_intent, rule_based_confidence
+    
+    def classify_rules(self, text: str, language: str, context: Optional[Dict] = None) -> Tuple[str, float]:
+        """
+        Classify intent with the rule-based patterns only (never builds the semantic fallback)
+        
+        Args:
+            text: Input text to classify
+            language: Detected language code
+            context: Optional context (order_number, customer_id, conversation_stage, etc.)
+            
+        Returns:
+            Tuple of (intent, confidence_score)
+        """
+        if not text:
+            return 'unknown', 0.0
         
-        # Get conversation stage from context for context-aware boosting
+        rule_based_intent, rule_based_confidence, _ = self._classify_rules(text, language, context)
+        return rule_based_intent, rule_based_confidence
+    
+    def classify_batch(self, texts: List[str], languages: List[str], contexts: Optional[List[Optional[Dict]]] = None) -> List[Tuple[str, float]]:
+        """
+        Classify intents for several texts
+        
+        Rule-based scoring runs per text; texts that need the semantic fallback
+        are vectorized and compared against the intent examples in one call.
+        
+        Args:
+            texts: Input texts to classify
+            languages: Detected language code for each text
+            contexts: Optional context for each text
+            
+        Returns:
+            List of (intent, confidence_score) tuples, in input order
+        """
+        if contexts is None:
+            contexts = [None] * len(texts)
+        
+        results: List[Tuple[str, float]] = []
+        rule_results = {}
+        semantic_indices = []
+        for i, (text, language, context) in enumerate(zip(texts, languages, contexts)):
+            if not text:
+                results.append(('unknown', 0.0))
+                continue
+            
+            rule_based_intent, rule_based_confidence, rule_based_scores = self._classify_rules(text, language, context)
+            results.append((rule_based_intent, rule_based_confidence))
+            if self._needs_semantic(rule_based_intent, rule_based_confidence):
+                rule_results[i] = (rule_based_intent, rule_based_confidence, rule_based_scores)
+                semantic_indices.append(i)
+        
+        if semantic_indices:
+            semantic_batch = self.semantic_classifier.classify_batch(
+                [texts[i] for i in semantic_indices],
+                [languages[i] for i in semantic_indices],
+                top_k=3
+            )
+            for i, semantic_results in zip(semantic_indices, semantic_batch):
+                results[i] = self._combine_with_semantic(*rule_results[i], semantic_results)
+        
+        return results
+    
+    def _classify_rules(self, text: str, language: str, context: Optional[Dict] = None) -> Tuple[str, float, Dict[str, float]]:
+        """
+        Score intents with the regex patterns and context boosts
+        
+        Args:
+            text: Input text to classify (non-empty)
+            language: Detected language code
+            context: Optional context
+            
+        Returns:
+            Tuple of (intent, confidence_score, normalized_intent_scores)
+        """
+        # Only these parts of the context affect scoring, so they make up the cache key
         conversation_stage = context.get('conversation_stage') if context else None
+        has_proposed_solution = bool(context and context.get('proposed_solution'))
+        mentions_substitution = False
+        if context and not conversation_stage:
+            context_text = str(context).lower()
+            mentions_substitution = 'substitution' in context_text or 'replacement' in context_text
+        if not isinstance(conversation_stage, str):
+            conversation_stage = None  # No stage boosts apply; keeps the key hashable
+        
+        intent, confidence, intent_scores = self._cached_rule_scores(
+            text.lower(), language, conversation_stage, has_proposed_solution, mentions_substitution
+        )
+        return intent, confidence, dict(intent_scores)  # Copy, the cached scores are shared
+    
+    def _score_rules(self, text_lower: str, language: str, conversation_stage: Optional[str],
+                     has_proposed_solution: bool, mentions_substitution: bool) -> Tuple[str, float, Dict[str, float]]:
+        """
+        Score intents for lowercase text and the scoring-relevant parts of the context
+        
+        Args:
+            text_lower: Lowercase input text (non-empty)
+            language: Detected language code
+            conversation_stage: Conversation stage from the context, if any
+            has_proposed_solution: Whether the context proposes a solution
+            mentions_substitution: Whether a stage-less context mentions a substitution/replacement
+            
+        Returns:
+            Tuple of (intent, confidence_score, normalized_intent_scores)
+        """
+        intent_scores: Dict[str, float] = {}
         
         # Check for negation first
         has_negation = self._has_negation(text_lower, language)
         
+        # Intents with none of their pattern-opening words in the text cannot match
+        candidates = self._candidate_intents(text_lower, language)
+        
+        # Phrase checks for the score adjustments, once per text rather than per intent
+        has_callback_phrase = any(phrase in text_lower for phrase in self.CALLBACK_PHRASES)
+        # A discrepancy phrase with at least 2 numbers suggests a quantity comparison
+        has_quantity_discrepancy = (
+            any(phrase in text_lower for phrase in self.DISCREPANCY_PHRASES)
+            and len(self._number_re.findall(text_lower)) >= 2
+        )
+        has_issue_phrase = any(phrase in text_lower for phrase in self.ISSUE_PHRASES)
+        mentions_my_order = 'in my order' in text_lower or 'from my order' in text_lower
+        has_time_request = (
+            any(time_word in text_lower for time_word in self.TIME_WORDS)
+            and any(need_word in text_lower for need_word in self.NEED_WORDS)
+        )
+        
+        rules = self._intent_rules[text_lower.isascii()]
+        
         # Check each intent pattern
-        for intent, lang_patterns in self.compiled_patterns.items():
-            score = 0.0
-            patterns = lang_patterns.get(language, lang_patterns.get('en', []))
+        for intent, patterns, union in rules.get(language, rules['en']):
+            # Count per pattern only if one of them matches somewhere. The adjustments
+            # below only scale the score, so an intent without a match stays out
+            if intent not in candidates or union is None or not union.search(text_lower):
+                continue
             
+            score = 0.0
             for pattern in patterns:
                 matches = pattern.findall(text_lower)
                 if matches:
                     # Score based on number of matches and pattern specificity
                     score += len(matches) * 0.3
-                    # Boost if full match (not just partial)
-                    if pattern.search(text_lower):
-                        score += 0.5
+                    # Bonus for each pattern that matches at all (findall found something)
+                    score += 0.5
             
             # Penalize confirm_substitution if negation is present
             if intent == 'confirm_substitution' and has_negation:
@@ -334,97 +740,61 @@ class IntentClassifier:
             
             # Prioritize request_callback over report_issue when callback phrases are present
             if intent == 'request_callback':
-                callback_phrases = ['speak to', 'talk to', 'need to speak', 'want to speak', 'someone', 'human', 'person', 'agent']
-                if any(phrase in text_lower for phrase in callback_phrases):
+                if has_callback_phrase:
                     score *= 1.5  # Boost callback intent
             
             # Penalize report_issue if request_callback phrases are present
             if intent == 'report_issue':
-                callback_phrases = ['speak to', 'talk to', 'need to speak', 'want to speak', 'someone', 'human', 'person', 'agent']
-                if any(phrase in text_lower for phrase in callback_phrases):
+                if has_callback_phrase:
                     score *= 0.3  # Heavily penalize report_issue when callback intent is more appropriate
             
             # Boost report_issue if quantity discrepancy patterns are detected
             if intent == 'report_issue':
-                # Check for quantity discrepancy phrases
-                discrepancy_phrases = [
-                    'only', 'not', 'should be', 'expected', 'but got', 'but received',
-                    'instead of', 'quantity', 'amount', 'number'
-                ]
-                if any(phrase in text_lower for phrase in discrepancy_phrases):
-                    # Check if there are numbers in the text (likely quantities)
-                    numbers = re.findall(r'\b\d+\b', text_lower)
-                    if len(numbers) >= 2:  # At least 2 numbers suggests quantity comparison
-                        score *= 1.5
+                if has_quantity_discrepancy:
+                    score *= 1.5
                 
                 # Boost for "there is no" or "not in my order" patterns
-                issue_phrases = ['there is no', "there's no", 'there are no', 'not in my order', 'missing from my order', 'in my order there is no']
-                if any(phrase in text_lower for phrase in issue_phrases):
+                if has_issue_phrase:
                     score *= 2.0  # Strong boost for these patterns
             
             # Penalize reject_substitution when "in my order" is present (more likely to be report_issue)
             if intent == 'reject_substitution':
-                if 'in my order' in text_lower or 'from my order' in text_lower:
+                if mentions_my_order:
                     score *= 0.3  # Heavily penalize - this is likely report_issue, not rejection
             
             # Boost change_delivery or query_order_status for time-related requests
             if intent in ['change_delivery', 'query_order_status']:
-                time_words = ['tomorrow', 'today', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday', 'next week']
-                need_words = ['need', 'want', 'have to', 'must', 'should', 'get', 'receive']
-                if any(time_word in text_lower for time_word in time_words) and any(need_word in text_lower for need_word in need_words):
+                if has_time_request:
                     score *= 1.4  # Boost if time word + need word present
             
             if score > 0:
                 intent_scores[intent] = score
         
         # Context-based adjustments based on conversation stage
+        self._apply_multipliers(intent_scores, self.STAGE_MULTIPLIERS.get(conversation_stage, {}))
         if conversation_stage == 'pre_order_substitution':
-            # Pre-order: Boost substitution-related intents
-            if 'confirm_substitution' in intent_scores:
-                intent_scores['confirm_substitution'] *= 1.8
-            if 'reject_substitution' in intent_scores:
-                intent_scores['reject_substitution'] *= 1.8
-            if 'query_substitution' in intent_scores:
-                intent_scores['query_substitution'] *= 1.5
             # Lower threshold for simple yes/no responses
-            if text_lower.strip() in ['yes', 'yeah', 'yep', 'ok', 'okay', 'sure']:
-                if 'confirm_substitution' not in intent_scores:
-                    intent_scores['confirm_substitution'] = 0.7
-            if text_lower.strip() in ['no', 'nope', 'nah']:
-                if 'reject_substitution' not in intent_scores:
-                    intent_scores['reject_substitution'] = 0.7
+            reply = text_lower.strip()
+            if reply in self.YES_REPLIES:
+                intent_scores.setdefault('confirm_substitution', 0.7)
+            if reply in self.NO_REPLIES:
+                intent_scores.setdefault('reject_substitution', 0.7)
         
         elif conversation_stage == 'post_delivery_investigation':
-            # Post-delivery: Boost issue-related intents
-            if 'report_issue' in intent_scores:
-                intent_scores['report_issue'] *= 1.8
-            if 'confirm_delivery' in intent_scores:
-                intent_scores['confirm_delivery'] *= 1.5
-            if 'query_order_status' in intent_scores:
-                intent_scores['query_order_status'] *= 1.5
             # If proposed_solution exists, boost solution acceptance/rejection
-            if context and context.get('proposed_solution'):
-                if 'confirm_substitution' in intent_scores:
-                    intent_scores['confirm_substitution'] *= 1.5
-                if 'reject_substitution' in intent_scores:
-                    intent_scores['reject_substitution'] *= 1.5
+            if has_proposed_solution:
+                self._apply_multipliers(intent_scores, self.SOLUTION_MULTIPLIERS)
             # Boost report_issue for phrases like "didn't receive", "missing", "there is no", etc.
-            issue_indicators = ["didn't receive", "did not receive", "not receive", "missing", "didn't get", 
-                              "there is no", "there's no", "not in my order", "missing from my order"]
-            if any(phrase in text_lower for phrase in issue_indicators):
+            if any(phrase in text_lower for phrase in self.ISSUE_INDICATORS):
                 if 'report_issue' not in intent_scores:
                     intent_scores['report_issue'] = 0.7
                 else:
                     intent_scores['report_issue'] *= 1.5
         
         # Legacy context-based adjustments (for backward compatibility)
-        if context and not conversation_stage:
+        if mentions_substitution:
             # If context has substitution info, boost substitution intents
-            if 'substitution' in str(context).lower() or 'replacement' in str(context).lower():
-                if 'confirm_substitution' in intent_scores:
-                    intent_scores['confirm_substitution'] *= 1.5
-                if 'reject_substitution' in intent_scores:
-                    intent_scores['reject_substitution'] *= 1.5
+            self._apply_multipliers(intent_scores, self.SOLUTION_MULTIPLIERS)
         
         # Normalize scores and calculate confidence
         if intent_scores:
@@ -446,7 +816,7 @@ class IntentClassifier:
             dominance_ratio = base_confidence / max(total_score / max_score, 1.0) if total_score > 0 else base_confidence
             
             # Penalize for vague text (short, common words)
-            text_words = len(text.split())
+            text_words = len(text_lower.split())  # Lowercasing keeps whitespace as is
             vague_penalty = 1.0
             if text_words <= 4:  # Very short text
                 vague_penalty = 0.85
@@ -467,36 +837,61 @@ class IntentClassifier:
             rule_based_confidence = 0.3
             rule_based_scores = {}
         
-        # Hybrid approach: Use semantic similarity as fallback
+        return rule_based_intent, rule_based_confidence, rule_based_scores
+    
+    @staticmethod
+    def _apply_multipliers(intent_scores: Dict[str, float], multipliers: Dict[str, float]):
+        """Scale the scores of matched intents in place"""
+        for intent, multiplier in multipliers.items():
+            if intent in intent_scores:
+                intent_scores[intent] *= multiplier
+    
+    def _needs_semantic(self, rule_based_intent: str, rule_based_confidence: float) -> bool:
+        """Check if the rule-based result should fall back to semantic similarity"""
         semantic_threshold = config.get('nlu.semantic_threshold', 0.5)
         use_semantic = config.get('nlu.use_semantic_fallback', True)
         
-        if use_semantic and self.semantic_classifier and self.semantic_classifier.is_available():
-            # Use semantic if rule-based confidence is low or intent is unknown
-            if rule_based_confidence < semantic_threshold or rule_based_intent == 'unknown':
-                semantic_results = self.semantic_classifier.classify(text, language, top_k=3)
+        # Use semantic if rule-based confidence is low or intent is unknown
+        if not (rule_based_confidence < semantic_threshold or rule_based_intent == 'unknown'):
+            return False
+        
+        # Checked last: the first access builds the semantic classifier
+        return bool(use_semantic and self.semantic_classifier and self.semantic_classifier.is_available())
+    
+    def _combine_with_semantic(self, rule_based_intent: str, rule_based_confidence: float, rule_based_scores: Dict[str, float], semantic_results: List[Tuple[str, float]]) -> Tuple[str, float]:
+        """
+        Combine the rule-based result with semantic classifier results
+        
+        Args:
+            rule_based_intent: Intent from rule-based scoring
+            rule_based_confidence: Rule-based confidence
+            rule_based_scores: Normalized rule-based intent scores
+            semantic_results: (intent, similarity) tuples from the semantic classifier
+            
+        Returns:
+            Tuple of (intent, confidence_score)
+        """
+        if semantic_results:
+            semantic_intent, semantic_score = semantic_results[0]
+            semantic_weight = config.get('nlu.semantic_weight', 0.8)
+            weighted_semantic_score = semantic_score * semantic_weight
+            
+            # Combine scores: take max of rule-based and weighted semantic
+            if rule_based_intent and rule_based_intent != 'unknown' and rule_based_intent in rule_based_scores:
+                # Both methods have results - combine them
+                rule_score = rule_based_scores.get(rule_based_intent, 0.0)
+                combined_score = max(rule_score, weighted_semantic_score)
                 
-                if semantic_results:
-                    semantic_intent, semantic_score = semantic_results[0]
-                    semantic_weight = config.get('nlu.semantic_weight', 0.8)
-                    weighted_semantic_score = semantic_score * semantic_weight
-                    
-                    # Combine scores: take max of rule-based and weighted semantic
-                    if rule_based_intent and rule_based_intent != 'unknown' and rule_based_intent in rule_based_scores:
-                        # Both methods have results - combine them
-                        rule_score = rule_based_scores.get(rule_based_intent, 0.0)
-                        combined_score = max(rule_score, weighted_semantic_score)
-                        
-                        # If semantic is significantly better, use it
-                        if weighted_semantic_score > rule_score * 1.2:
-                            return semantic_intent, min(weighted_semantic_score, 0.95)
-                        else:
-                            return rule_based_intent, min(combined_score, 0.95)
-                    else:
-                        # Rule-based failed, use semantic
-                        return semantic_intent, min(weighted_semantic_score, 0.95)
+                # If semantic is significantly better, use it
+                if weighted_semantic_score > rule_score * 1.2:
+                    return semantic_intent, min(weighted_semantic_score, 0.95)
+                else:
+                    return rule_based_intent, min(combined_score, 0.95)
+            else:
+                # Rule-based failed, use semantic
+                return semantic_intent, min(weighted_semantic_score, 0.95)
         
-        # Return rule-based result (or unknown if no scores)
+        # No semantic match, keep rule-based result
         return rule_based_intent, rule_based_confidence
     
     def _has_negation(self, text: str, language: str) -> bool:
@@ -510,12 +905,6 @@ class IntentClassifier:
         Returns:
             True if negation is detected
         """
-        negation_words = {
-            'en': ['no', 'not', "don't", "doesn't", "didn't", "won't", "can't", "couldn't", "shouldn't", "wouldn't", "isn't", "aren't", "wasn't", "weren't", 'never', 'nothing', 'nobody'],
-            'fi': ['ei', 'en', 'et', 'emme', 'ette', 'eivät', 'ei ole', 'ei ollut', 'ei koskaan'],
-            'sv': ['inte', 'ej', 'aldrig', 'ingenting', 'ingen', 'är inte', 'var inte']
-        }
-        
-        words = negation_words.get(language, negation_words['en'])
-        return any(word in text for word in words)
+        pattern = self._negation_res.get(language, self._negation_res['en'])
+        return pattern.search(text) is not None
 
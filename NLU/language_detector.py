@@ -30,6 +30,15 @@ class LanguageDetector:
     FINNISH_CHARS = r'[äöåÄÖÅ]'
     SWEDISH_CHARS = r'[åäöÅÄÖ]'
     
+    def __init__(self):
+        """Initialize language detector and compile patterns"""
+        self.indicator_patterns = {
+            lang: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for lang, patterns in self.LANGUAGE_INDICATORS.items()
+        }
+        self.finnish_chars = re.compile(self.FINNISH_CHARS)
+        self.swedish_chars = re.compile(self.SWEDISH_CHARS)
+    
     def detect(self, text: str) -> str:
         """
         Detect language from text
@@ -47,17 +56,17 @@ class LanguageDetector:
         scores: Dict[str, float] = {'en': 0.0, 'fi': 0.0, 'sv': 0.0}
         
         # Check for Finnish characters
-        if re.search(self.FINNISH_CHARS, text):
+        if self.finnish_chars.search(text):
             scores['fi'] += 2.0
         
         # Check for Swedish characters
-        if re.search(self.SWEDISH_CHARS, text):
+        if self.swedish_chars.search(text):
             scores['sv'] += 2.0
         
         # Check language indicators
-        for lang, patterns in self.LANGUAGE_INDICATORS.items():
+        for lang, patterns in self.indicator_patterns.items():
             for pattern in patterns:
-                matches = len(re.findall(pattern, text_lower, re.IGNORECASE))
+                matches = sum(1 for _ in pattern.finditer(text_lower))
                 scores[lang] += matches * 0.5
         
         # Normalize scores by text length
@@ -40,6 +40,7 @@ class ProductCatalog:
         
         self.catalog_path = catalog_path or self._find_catalog_path()
         self._catalog: List[Dict] = []
+        self.version = 0  # Bumped on reload so consumers can invalidate derived indexes
         self._load_catalog()
         self._initialized = True
     
@@ -47,6 +48,7 @@ class ProductCatalog:
         """Reload catalog from file (useful for cache invalidation)"""
         self._catalog = []
         self._load_catalog()
+        self.version += 1
         logger.info("Product catalog reloaded")
     
     def _find_catalog_path(self) -> Optional[str]:
@@ -201,6 +203,11 @@ class ProductCatalog:
         """
         return self._catalog
     
+    @property
+    def count(self) -> int:
+        """Number of products in the catalog"""
+        return len(self._catalog)
+    
     def find_product(self, name: str) -> Optional[Dict]:
         """
         Find a product by name
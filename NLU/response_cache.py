@@ -0,0 +1,129 @@
+"""
+LRU cache for parse responses of repeated utterances
+"""
+
+import copy
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from config import config
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL"""
+    
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300, enabled: bool = True):
+        """
+        Initialize response cache
+        
+        Args:
+            max_size: Maximum number of cached responses
+            ttl_seconds: Seconds before a cached response expires
+            enabled: Whether caching is enabled
+        """
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._enabled = enabled and max_size > 0
+    
+    @staticmethod
+    def make_key(text: str, context: Optional[Dict], priority_entities: Optional[List[str]] = None,
+                 catalog_version: int = 0) -> Optional[Tuple]:
+        """
+        Build a cache key from text, context, priority entities and catalog version
+        
+        Args:
+            text: Input text
+            context: Optional context
+            priority_entities: Optional entity types boosted during extraction
+            catalog_version: Product catalog version, so matches made before a reload are not served
+        
+        Returns:
+            Hashable key, or None if the context cannot be serialized
+        """
+        priority = tuple(priority_entities or ())
+        if not context:
+            return text, '', priority, catalog_version
+        try:
+            # Flat contexts (the usual case) key on their items; the type keeps 1, 1.0 and True apart
+            return text, frozenset((name, type(value), value) for name, value in context.items()), priority, catalog_version
+        except TypeError:
+            pass
+        try:
+            # Nested values are unhashable: fall back to canonical JSON
+            return text, json.dumps(context, sort_keys=True), priority, catalog_version
+        except (TypeError, ValueError):
+            return None
+    
+    def get(self, key: Optional[Hashable]) -> Optional[Dict]:
+        """
+        Get a cached response
+        
+        The response, its 'parameters' and their 'entities' are fresh dicts, so callers
+        may set keys on them (timestamps, metadata, context order numbers). Entity values
+        are shared with the cache and must not be modified in place.
+        
+        Args:
+            key: Key from make_key
+        
+        Returns:
+            Cached response or None
+        """
+        if not self._enabled or key is None:
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, response = entry
+            if time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        
+        # Callers add metadata to responses, so never hand out the cached dicts they set keys on
+        response = dict(response)
+        if isinstance(response.get('parameters'), dict):
+            parameters = response['parameters'] = dict(response['parameters'])
+            if isinstance(parameters.get('entities'), dict):
+                parameters['entities'] = dict(parameters['entities'])
+        return response
+    
+    def put(self, key: Optional[Hashable], response: Dict):
+        """
+        Cache a copy of a response (the caller keeps modifying the original)
+        
+        Args:
+            key: Key from make_key
+            response: Parse response
+        """
+        if not self._enabled or key is None:
+            return
+        
+        response = copy.deepcopy(response)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_size=config.get('cache.max_size', 10000),
+    ttl_seconds=config.get('cache.ttl_seconds', 300),
+    enabled=config.get('cache.enabled', True)
+)
@@ -5,11 +5,12 @@ Lightweight alternative to deep learning models
 """
 
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from scipy.sparse import vstack
     import numpy as np
     SEMANTIC_AVAILABLE = True
 except ImportError:
@@ -17,6 +18,7 @@ except ImportError:
     np = None
     logging.warning("scikit-learn not available. Semantic classification disabled.")
 
+from config import config
 from intent_examples import INTENT_EXAMPLES
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,14 @@ class SemanticIntentClassifier:
         """Initialize semantic intent classifier"""
         self.vectorizer = None
         self.intent_vectors = {}  # Cache TF-IDF vectors for intent examples
+        # All example vectors stacked by intent, for one similarity product per call
+        self._example_matrix = None
+        self._matrix_intents: List[str] = []
+        self._intent_starts = None  # First row of each intent in _example_matrix
         self.intent_examples = INTENT_EXAMPLES
+        # Memoize similarity results by (text, language, top_k): texts that miss the rules
+        # tend to be the same few phrasings, resent across sessions and client retries
+        self._cached_classify = lru_cache(maxsize=config.get('cache.semantic_max_size', 1024))(self._classify)
         
         if not SEMANTIC_AVAILABLE:
             logger.warning("Semantic classification disabled - scikit-learn not installed")
@@ -46,7 +55,8 @@ class SemanticIntentClassifier:
                 lowercase=True,
                 analyzer='word',
                 token_pattern=r'(?u)\b\w+\b',  # Word tokenizer
-                max_features=5000  # Limit vocabulary size for efficiency
+                max_features=5000,  # Limit vocabulary size for efficiency
+                dtype=np.float32  # Half the memory and bandwidth of float64 for the example matrices
             )
             
             # Pre-compute vectors for all intent examples
@@ -97,6 +107,16 @@ class SemanticIntentClassifier:
                     except Exception as e:
                         logger.warning(f"Failed to compute vectors for {intent}: {e}")
                         self.intent_vectors[intent] = None
+            
+            # Rows are L2-normalized (TfidfVectorizer's default norm), so cosine similarity is a
+            # dot product: stack the transposed example vectors once and score every intent with a
+            # single sparse product instead of a cosine_similarity call per intent
+            stacked = [(intent, vectors) for intent, vectors in self.intent_vectors.items()
+                       if intent != 'unknown' and vectors is not None and vectors.shape[0] > 0]
+            if stacked:
+                self._matrix_intents = [intent for intent, _ in stacked]
+                self._intent_starts = np.cumsum([0] + [vectors.shape[0] for _, vectors in stacked[:-1]])
+                self._example_matrix = vstack([vectors for _, vectors in stacked]).T.tocsr()
         except Exception as e:
             logger.error(f"Failed to fit vectorizer: {e}")
             self.vectorizer = None
@@ -120,32 +140,70 @@ class SemanticIntentClassifier:
             return []
         
         try:
-            # Vectorize input text
-            text_vector = self.vectorizer.transform([text])
-            
-            intent_scores = {}
+            return list(self._cached_classify(text, language, top_k))
+        except Exception as e:
+            logger.error(f"Error in semantic classification: {e}", exc_info=True)
+            return []
+    
+    def _classify(self, text: str, language: str, top_k: int) -> Tuple[Tuple[str, float], ...]:
+        """
+        Score text against the intent examples (memoized by classify; errors propagate uncached)
+        
+        Args:
+            text: Input text to classify (non-blank)
+            language: Detected language code
+            top_k: Number of top intents to return
             
-            # Compare against all intent examples
-            for intent, vectors in self.intent_vectors.items():
-                if intent == 'unknown' or vectors is None:
-                    continue
-                
-                # Compute cosine similarity with all examples for this intent
-                similarities = cosine_similarity(text_vector, vectors)[0]
-                
-                # Take max similarity as the score for this intent
-                if len(similarities) > 0:
-                    max_similarity = float(np.max(similarities))
-                    # Normalize to 0-1 range (cosine similarity is already 0-1)
-                    intent_scores[intent] = max(0.0, min(1.0, max_similarity))
+        Returns:
+            Tuple of (intent, similarity_score) pairs, sorted by score descending
+        """
+        if self._example_matrix is None:
+            return ()
+        
+        # Max similarity over each intent's examples (cosine similarity is already 0-1 for TF-IDF)
+        similarities = (self.vectorizer.transform([text]) @ self._example_matrix).toarray()
+        intent_scores = np.clip(np.maximum.reduceat(similarities, self._intent_starts, axis=1)[0], 0.0, 1.0)
+        
+        # Sort by score and return top_k
+        sorted_intents = sorted(zip(self._matrix_intents, intent_scores.tolist()), key=lambda x: x[1], reverse=True)
+        return tuple(sorted_intents[:top_k])
+    
+    def classify_batch(self, texts: List[str], languages: Optional[List[str]] = None, top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Classify several texts with a single vectorizer and similarity pass
+        
+        Args:
+            texts: Input texts to classify
+            languages: Detected language code for each text (currently unused, as in classify)
+            top_k: Number of top intents to return per text
+        
+        Returns:
+            One list of (intent, similarity_score) tuples per input text, same as classify
+        """
+        results: List[List[Tuple[str, float]]] = [[] for _ in texts]
+        if not self.vectorizer or not SEMANTIC_AVAILABLE:
+            return results
+        
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices:
+            return results
+        
+        try:
+            if self._example_matrix is None:
+                return results
             
-            # Sort by score and return top_k
-            sorted_intents = sorted(intent_scores.items(), key=lambda x: x[1], reverse=True)
-            return sorted_intents[:top_k]
+            # Vectorize all input texts at once; max similarity per text for each intent
+            similarities = (self.vectorizer.transform([texts[i] for i in indices]) @ self._example_matrix).toarray()
+            intent_scores = np.clip(np.maximum.reduceat(similarities, self._intent_starts, axis=1), 0.0, 1.0)
             
+            for row, i in enumerate(indices):
+                sorted_intents = sorted(zip(self._matrix_intents, intent_scores[row].tolist()), key=lambda x: x[1], reverse=True)
+                results[i] = sorted_intents[:top_k]
+        
         except Exception as e:
-            logger.error(f"Error in semantic classification: {e}", exc_info=True)
-            return []
+            logger.error(f"Error in batch semantic classification: {e}", exc_info=True)
+        
+        return results
     
     def is_available(self) -> bool:
         """Check if semantic classification is available"""
@@ -0,0 +1,220 @@
+"""
+Unit tests for the parse pipeline and API routes
+"""
+
+import json
+
+import pytest
+
+import app
+
+
+def test_low_confidence_reply_keeps_text_entities():
+    """Test replies below the entity skip threshold still carry dates, quantities and urgency"""
+    result = app.parse_post_delivery("2024-09-02")
+    assert result['confidence'] < app.ENTITY_SKIP_THRESHOLD
+    assert [date['value'] for date in result['parameters']['entities']['dates']] == ['2024-09-02']
+
+    result = app.parse_post_delivery("5 kg")
+    assert result['confidence'] < app.ENTITY_SKIP_THRESHOLD
+    assert {'value': 5, 'unit': 'kg', 'confidence': 0.8} in result['parameters']['entities']['quantities']
+
+    entities = app.parse_post_delivery("asap")['parameters']['entities']
+    assert entities['urgency']['level'] == 'high'
+    assert entities['products'] == []
+    assert entities['sentiment']['method'] == 'skipped'
+
+
+def test_warm_up_and_health_leave_semantic_classifier_lazy(monkeypatch):
+    """Test warm-up and the health check do not build the semantic fallback"""
+    monkeypatch.setattr(app, 'intent_classifier', app.IntentClassifier())
+    app.warm_up()
+    assert not app.intent_classifier.semantic_classifier_loaded
+
+    response = app.app.test_client().get('/health')
+    assert response.get_json()['components']['semantic_classifier'] is False
+    assert not app.intent_classifier.semantic_classifier_loaded
+
+
+def _items(*texts, session_id=None):
+    return [{'text': text, 'context': None, 'session_id': session_id} for text in texts]
+
+
+def test_batch_results_follow_input_order():
+    """Test batch results line up with their items, as single parses would"""
+    texts = ["where is my order?", "yes please", "hello", "cancel my order", "2024-09-02"]
+    results = app.parse_texts(_items(*texts))
+    assert [result['intent'] for result in results] == [app.parse_single_text(text)['intent'] for text in texts]
+    assert all(result['processing_time_ms'] >= 0 for result in results)
+
+
+def test_session_waves_hold_one_item_per_session():
+    """Test items sharing a session run in successive waves, in input order"""
+    items = _items("a", "b", session_id='s1') + _items("c") + _items("d", session_id='s2') + _items("e", session_id='s1')
+    assert app._session_waves(items) == [[0, 2, 3], [1], [4]]
+
+    app.parse_texts(_items("hello", "where is my order?", "thank you", session_id='batch-waves'))
+    history = app.session_manager.get_session('batch-waves')['history']
+    assert [entry['text'] for entry in history] == ["hello", "where is my order?", "thank you"]
+
+
+def test_batch_item_errors_stay_per_item(monkeypatch):
+    """Test a failing item yields an error result without failing the rest"""
+    prepare_text = app._prepare_text
+
+    def failing_prepare(text, context, session_id):
+        if text == "boom":
+            raise RuntimeError("prepare failed")
+        return prepare_text(text, context, session_id)
+
+    monkeypatch.setattr(app, '_prepare_text', failing_prepare)
+    results = app.parse_texts(_items("hello", "boom", "where is my order?", session_id=None))
+    assert results[1]['error'] == "prepare failed"
+    assert 'error' not in results[0] and 'error' not in results[2]
+
+    classify = app.intent_classifier.classify
+
+    def failing_classify(text, language, context=None):
+        if text == "bad item":
+            raise RuntimeError("classify failed")
+        return classify(text, language, context)
+
+    def failing_batch(*args):
+        raise RuntimeError("batch failed")
+
+    monkeypatch.setattr(app.intent_classifier, 'classify_batch', failing_batch)
+    monkeypatch.setattr(app.intent_classifier, 'classify', failing_classify)
+    results = app.parse_texts(_items("thanks a lot", "bad item", "hi there", session_id=None))
+    assert results[1]['error'] == "classify failed"
+    assert [result['intent'] for result in (results[0], results[2])] == ['thank_you', 'greeting']
+
+
+def test_batch_items_use_response_cache(monkeypatch):
+    """Test sessionless batch items are cached like single parses"""
+    first = app.parse_texts(_items("my bread was missing from order 12345678"))[0]
+
+    def no_prepare(*args):
+        raise AssertionError("cached item was parsed again")
+
+    monkeypatch.setattr(app, '_prepare_text', no_prepare)
+    second = app.parse_texts(_items("my bread was missing from order 12345678"))[0]
+    assert second['intent'] == first['intent']
+    assert second['parameters'] == first['parameters']
+
+
+def test_catalog_reload_bypasses_cached_responses(monkeypatch):
+    """Test responses cached before a catalog reload are not served after it"""
+    app.parse_single_text("i want two liters of milk")
+    parsed = []
+    prepare_text = app._prepare_text
+
+    def counting_prepare(*args):
+        parsed.append(args[0])
+        return prepare_text(*args)
+
+    monkeypatch.setattr(app, '_prepare_text', counting_prepare)
+    monkeypatch.setattr(app.product_catalog, 'version', app.product_catalog.version + 1)
+    app.parse_single_text("i want two liters of milk")
+    app.parse_texts(_items("i want two liters of milk"))
+    assert parsed == ["i want two liters of milk"]
+
+
+def _stream_lines(payload):
+    response = app.app.test_client().post('/nlu/parse/batch/stream', json=payload)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    body = response.get_data(as_text=True)
+    assert body.endswith('\n')
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_batch_stream_frames_one_result_per_line():
+    """Test the NDJSON stream sends every item once, then a summary line"""
+    texts = ["where is my order?", "yes please", "hello", "cancel my order"]
+    lines = _stream_lines({'texts': texts})
+    results, summary = lines[:-1], lines[-1]
+
+    assert sorted(line['index'] for line in results) == [0, 1, 2, 3]
+    assert {line['index']: line['result']['intent'] for line in results} == {
+        i: app.parse_single_text(text)['intent'] for i, text in enumerate(texts)
+    }
+    assert summary['count'] == 4 and 'error' not in summary
+
+
+def test_batch_stream_keeps_session_order():
+    """Test items sharing a session are streamed in input order"""
+    lines = _stream_lines({'texts': ["hello", "where is my order?", "thanks"], 'session_id': 'stream-order'})
+    assert [line['index'] for line in lines[:-1]] == [0, 1, 2]
+
+
+def test_batch_stream_reports_failures_in_band(monkeypatch):
+    """Test item errors and a failure after headers are sent end up in the stream"""
+    def failing_iter(items):
+        yield 0, app._batch_error_result(items[0]['text'], RuntimeError("item failed"))
+        raise RuntimeError("stream failed")
+
+    monkeypatch.setattr(app, 'iter_parse_texts', failing_iter)
+    lines = _stream_lines({'texts': ["hello", "yes"]})
+    assert lines[0] == {'index': 0, 'result': {'error': "item failed", 'text': "hello", 'intent': 'unknown', 'confidence': 0.0}}
+    assert lines[1]['error'] == 'Failed to parse batch'
+    assert lines[1]['count'] == 1
+
+
+def test_batch_stream_rejects_invalid_payload():
+    """Test validation errors are returned before the stream starts"""
+    response = app.app.test_client().post('/nlu/parse/batch/stream', json={'texts': []})
+    assert response.status_code == 400
+
+
+def test_pre_and_post_parse_batches_add_stage_metadata():
+    """Test pre-/post-parse batch routes return per-item results with their stage metadata"""
+    client = app.app.test_client()
+    response = client.post('/nlu/pre-parse/batch', json={'items': [
+        {'text': "yes please", 'context': {'order_number': '12345678'}},
+        {'text': "no thanks"},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['metadata']['conversation_stage'] for result in results] == ['pre_order_substitution'] * 2
+    assert results[0]['parameters']['entities']['order_numbers'][0]['value'] == '12345678'
+    assert [result['intent'] for result in results] == ['confirm_substitution', 'reject_substitution']
+
+    response = client.post('/nlu/post-parse/batch', json={'texts': ["my milk is missing", "2024-09-02"]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert body['results'][0]['metadata']['missing_order_warning'] is True
+    assert body['results'][1]['parameters']['entities']['dates'][0]['value'] == '2024-09-02'
+
+
+def test_pre_parse_batch_item_errors_stay_per_item(monkeypatch):
+    """Test a failing pre-parse item yields an error result without failing the batch"""
+    parse_single_text = app.parse_single_text
+
+    def failing_parse(text, context=None, session_id=None, priority_entities=None):
+        if text == "boom":
+            raise RuntimeError("parse failed")
+        return parse_single_text(text, context, session_id, priority_entities)
+
+    monkeypatch.setattr(app, 'parse_single_text', failing_parse)
+    response = app.app.test_client().post('/nlu/pre-parse/batch', json={'texts': ["yes", "boom", "no"]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert results[1]['error'] == "parse failed"
+    assert [results[0]['intent'], results[2]['intent']] == ['confirm_substitution', 'reject_substitution']
+
+@pytest.mark.parametrize('route', ['/nlu/pre-parse/batch', '/nlu/post-parse/batch'])
+@pytest.mark.parametrize('payload, error_code, message', [
+    ({'items': [{'text': "yes"}, "no"]}, "INVALID_BATCH_ITEM", "Item 1 in batch is not an object"),
+    ({'items': [{'text': "yes"}, {'text': ""}]}, "MISSING_TEXT", "Item 1 in batch: "),
+    ({'items': [{'text': "yes", 'context': "not a dict"}]}, "INVALID_CONTEXT", "Item 0 in batch: "),
+    ({'texts': ["yes", 42]}, "INVALID_BATCH_ITEM", "Item 1 in batch is not a string"),
+    ({'texts': []}, "EMPTY_BATCH", "Batch request cannot be empty"),
+])
+def test_batch_routes_reject_invalid_items(route, payload, error_code, message):
+    """Test pre-/post-parse batch routes report which item failed validation"""
+    response = app.app.test_client().post(route, json=payload)
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['error'] == error_code
+    assert body['message'].startswith(message)
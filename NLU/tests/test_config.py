@@ -0,0 +1,22 @@
+"""
+Unit tests for configuration
+"""
+
+from config import Config, DEFAULT_CONFIG
+
+
+def test_get_dot_paths():
+    """Test leaf, section and missing paths"""
+    config = Config()
+    assert config.get('api.port') == DEFAULT_CONFIG['api']['port']
+    assert config.get('confidence') == DEFAULT_CONFIG['confidence']
+    assert config.get('api.missing', 'default') == 'default'
+    assert config.get('api.port.extra', 'default') == 'default'
+
+
+def test_env_override_does_not_change_defaults(monkeypatch):
+    """Test environment overrides stay on the instance"""
+    monkeypatch.setenv('NLU_PORT', '7000')
+    config = Config()
+    assert config.get('api.port') == 7000
+    assert DEFAULT_CONFIG['api']['port'] == 6060
@@ -0,0 +1,121 @@
+"""
+Unit tests for entity extraction
+"""
+
+import time
+
+import pytest
+
+from entity_extractor import EntityExtractor
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return EntityExtractor()
+
+
+def test_analyzer_input_is_bounded(extractor):
+    """Test punctuation and emoticon floods are collapsed and long text is clipped"""
+    assert extractor._clip_for_analyzer("great!!!!!!!!") == "great!!!!"
+    assert extractor._clip_for_analyzer("ok :) :) :) :) :) :)") == "ok :) :) :) :)"
+    assert extractor._clip_for_analyzer("fine!!!! :) :)") == "fine!!!! :) :)"
+    assert len(extractor._clip_for_analyzer("good " * 1000)) == extractor.sentiment_max_chars
+    assert extractor._clip_for_analyzer("!" * 10000 + " good") == "!!!! good"
+
+
+def test_flood_sentiment_keeps_trailing_words(extractor):
+    """Test words after a punctuation flood still drive sentiment"""
+    text = "!" * 10000 + " great"
+    result = extractor._extract_sentiment(text, text.lower(), 'en')
+    assert result['polarity'] == 'positive'
+
+
+def test_order_numbers_on_long_digit_runs(extractor):
+    """Test order number patterns stay fast on long voice-to-text digit runs"""
+    text = 'order number ' + '12 ' * 20000
+    start = time.perf_counter()
+    result = extractor._extract_order_numbers(text, 'en')
+    elapsed = time.perf_counter() - start
+    
+    assert result[0]['value'].startswith('121212')
+    assert elapsed < 0.5
+    
+    for language, keyword in (('en', 'order'), ('fi', 'tilaus'), ('sv', 'beställning')):
+        assert extractor._extract_order_numbers(keyword + ' ' * 20000 + '!', language) == []
+
+
+def test_priority_boost_does_not_change_cached_results(extractor):
+    """Test boosting memoized sentiment/urgency only affects the returned copy"""
+    text = "maybe later"
+    plain = extractor.extract(text, 'en')
+    boosted = extractor.extract(text, 'en', priority_entities=['sentiment', 'urgency'])
+    
+    assert boosted['sentiment']['confidence'] > plain['sentiment']['confidence']
+    assert boosted['urgency']['confidence'] > plain['urgency']['confidence']
+    assert extractor.extract(text, 'en') == plain
+
+
+def test_priority_boost_does_not_change_cached_entities(extractor):
+    """Test boosting memoized reasons/dates only affects the returned copies"""
+    text = "the milk from yesterday was broken"
+    plain = extractor.extract(text, 'en')
+    boosted = extractor.extract(text, 'en', priority_entities=['reasons', 'dates'])
+    
+    assert boosted['reasons'][0]['confidence'] > plain['reasons'][0]['confidence']
+    assert boosted['dates'][0]['confidence'] > plain['dates'][0]['confidence']
+    assert extractor.extract(text, 'en') == plain
+
+
+def test_fuzzy_match_uses_capitalized_names(extractor):
+    """Test capitalized names from the original-case text are fuzzy matched"""
+    catalog = [
+        {'gtin': '1', 'name': 'Juustoportti Milk 1L', 'name_variants': []},
+        {'gtin': '2', 'name': 'Rye Bread', 'name_variants': []},
+    ]
+    index = extractor._build_catalog_index(0, catalog)
+    text = "Can I get Juustoporti"
+    
+    result = extractor._fuzzy_match_products(text.lower(), index, extractor._proper_noun_re.findall(text))
+    assert [gtin for _, gtin, _ in result] == ['1']
+
+
+def test_trivial_replies_skip_analyzers(extractor):
+    """Test single-word replies short-circuit, except where intent context decides"""
+    assert extractor._extract_sentiment("Ok.", "ok.", 'en') == {'polarity': 'positive', 'confidence': 0.9, 'method': 'trivial'}
+    assert extractor._extract_sentiment("nej", "nej", 'sv')['polarity'] == 'negative'
+    assert extractor._extract_sentiment("ok?", "ok?", 'en')['method'] != 'trivial'
+    assert extractor._extract_sentiment("ok", "ok", 'en', 'report_issue')['polarity'] == 'negative'
+
+
+def test_catalog_index_skips_nameless_products(extractor):
+    """Test nameless products are left out and variants repeating the name are dropped"""
+    catalog = [
+        {'gtin': '1', 'name': '', 'name_variants': ['milk']},
+        {'gtin': '2', 'name': 'Milk', 'name_variants': ['milk', 'MILK', 'maito']},
+    ]
+    index = extractor._build_catalog_index(0, catalog)
+    assert index.gtins == ['2']
+    assert index.variants_lower == [['maito']]
+
+
+def test_question_openers_are_whole_words(extractor):
+    """Test "however"/"whatever" openers don't make a statement a question"""
+    text = "however the milk was great"
+    assert extractor._extract_sentiment_patterns(text, 'en')['polarity'] == 'positive'
+    assert extractor._extract_sentiment_patterns("what's great about it", 'en')['polarity'] == 'neutral'
+
+
+def test_reason_keywords_shared_and_bounded(extractor):
+    """Test a keyword can signal several reasons and only matches as a whole word"""
+    reasons = extractor._extract_reasons("the jar was broken, wrong amount too", 'en')
+    assert [(r['type'], r['value']) for r in reasons] == [
+        ('damaged', 'broken'), ('wrong', 'wrong'), ('defective', 'broken'), ('incorrect_quantity', 'wrong amount')
+    ]
+    assert extractor._extract_reasons("purkki oli rikkiä", 'fi') == []
+
+
+def test_politeness_words_keep_slot_answers_neutral(extractor):
+    """Test 'please' and 'urgent' do not make short slot answers positive"""
+    for text in ["on the 15th please", "Valio milk 2 liters please", "urgent! I need it now"]:
+        assert extractor._extract_sentiment(text, text.lower(), 'en')['polarity'] == 'neutral'
+    assert extractor._extract_sentiment("great, thanks", "great, thanks", 'en')['polarity'] == 'positive'
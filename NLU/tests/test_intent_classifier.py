@@ -0,0 +1,97 @@
+"""
+Unit tests for rule-based intent classification
+"""
+
+import re
+
+import pytest
+
+from intent_classifier import IntentClassifier
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return IntentClassifier()
+
+
+def test_required_literals_stop_at_regex_syntax():
+    """Test literal prefixes end before optional characters and regex syntax"""
+    assert IntentClassifier._required_literals(r'\b^(hello|hi|hey)\b') == ['hello', 'hi', 'hey']
+    assert IntentClassifier._required_literals(r"\b(i\'?ll take|i want)\b.*\b(it)\b") == ['i', 'i want']
+    assert IntentClassifier._required_literals(r'\b(what.*replacement|which)\b') == ['what', 'which']
+    assert IntentClassifier._required_literals(r'\b(\d+|only)\b') is None
+    assert IntentClassifier._required_literals(r'\bplain words\b') is None
+
+
+def test_linear_gaps_match_like_greedy_gaps():
+    """Test gap rewriting keeps matches and per-line counts of the original patterns"""
+    assert IntentClassifier._linear_gaps(r'\b(a|b).*\b(c)\b') == r'\b(a|b)(?>.*?\b(c)\b).*'
+    assert IntentClassifier._linear_gaps(r'\b(what.*replacement|which)\b') == r'\b(what.*replacement|which)\b'
+    
+    pattern = r'\b(not|no).*\b(in|from).*\b(my|the).*\b(order)\b'
+    for text in ["not in my order, no, not in my order", "no in the\nnot from my order", "not in my " * 50]:
+        assert len(re.findall(IntentClassifier._linear_gaps(pattern), text)) == len(re.findall(pattern, text))
+
+
+def test_candidate_intents_keep_matching_intents(classifier):
+    """Test the literal prefilter never drops an intent whose patterns match"""
+    for text in ["no thanks, i don't want a substitute", "ſkip it", "where is my order?", "kiitos paljon"]:
+        candidates = classifier._candidate_intents(text, 'en')
+        for intent, lang_patterns in classifier.compiled_patterns.items():
+            if any(pattern.search(text) for pattern in lang_patterns['en']):
+                assert intent in candidates
+
+
+def test_rule_scores_cached_per_scoring_context(classifier):
+    """Test memoized rule scores follow the context parts that affect scoring"""
+    text = "yes please"
+    plain = classifier._classify_rules(text, 'en')
+    plain[2].clear()
+    assert classifier._classify_rules("Yes please", 'en')[2]
+    
+    stage = {'conversation_stage': 'post_delivery_investigation'}
+    with_solution = {**stage, 'proposed_solution': 'refund'}
+    assert classifier._classify_rules(text, 'en', with_solution) != classifier._classify_rules(text, 'en', stage)
+    assert classifier._classify_rules(text, 'en', {'conversation_stage': ['unknown']})[0] == plain[0]
+
+
+def test_swedish_no_rejects_after_delivery(classifier):
+    """Test Swedish refusals stay rejections in the post-delivery stage"""
+    stage = {'conversation_stage': 'post_delivery_investigation'}
+    for text in ["nej tack", "Nej tack, hoppa över"]:
+        assert classifier.classify(text, 'sv', stage)[0] == 'reject_substitution'
+
+
+def test_negation_matches_whole_words(classifier):
+    """Test negation words are not found inside other words"""
+    assert classifier._has_negation("i cannot accept that", 'en')
+    assert classifier._has_negation("nope", 'en')
+    assert not classifier._has_negation("send it now, i know", 'en')
+    assert not classifier._has_negation("hej, jag vill ha min beställning", 'sv')
+    assert classifier._has_negation("nej tack", 'sv')
+    assert classifier._has_negation("en halua korvausta", 'fi')
+    assert not classifier._has_negation("kyllä, hyväksyn korvauksen", 'fi')
+
+
+def test_semantic_results_cached_as_fresh_lists(classifier):
+    """Test repeated semantic lookups return equal results callers can modify"""
+    semantic = classifier.semantic_classifier
+    if not (semantic and semantic.is_available()):
+        pytest.skip("scikit-learn not installed")
+    
+    first = semantic.classify("where is my stuff", 'en')
+    first.clear()
+    second = semantic.classify("where is my stuff", 'en')
+    assert second
+    assert second == semantic.classify_batch(["where is my stuff"], ['en'])[0]
+
+
+def test_semantic_classifier_built_on_first_access():
+    """Test the semantic fallback is only constructed when first needed"""
+    fresh = IntentClassifier()
+    assert fresh._semantic_classifier is None
+    assert fresh.classify("where is my order?", 'en')[0] == 'query_order_status'
+    assert fresh._semantic_classifier is None
+    
+    semantic = fresh.semantic_classifier
+    assert semantic is fresh.semantic_classifier
@@ -0,0 +1,58 @@
+"""
+Unit tests for response cache
+"""
+
+from response_cache import ResponseCache
+
+
+def test_cache_returns_copy():
+    """Test cached responses are isolated from caller mutation"""
+    cache = ResponseCache(max_size=10)
+    key = cache.make_key("yes", {'order_number': '123'})
+    cache.put(key, {'intent': 'confirm_substitution', 'parameters': {'entities': {}}})
+
+    first = cache.get(key)
+    first['parameters']['entities']['order_numbers'] = ['123']
+
+    assert cache.get(key) == {'intent': 'confirm_substitution', 'parameters': {'entities': {}}}
+
+
+def test_cache_evicts_least_recently_used():
+    """Test cache size limit evicts the oldest entry"""
+    cache = ResponseCache(max_size=2)
+    cache.put(('a', ''), {'intent': 'a'})
+    cache.put(('b', ''), {'intent': 'b'})
+    cache.get(('a', ''))
+    cache.put(('c', ''), {'intent': 'c'})
+
+    assert cache.get(('b', '')) is None
+    assert cache.get(('a', '')) == {'intent': 'a'}
+    assert len(cache) == 2
+
+
+def test_cache_key_depends_on_context():
+    """Test context order does not matter but values do"""
+    assert ResponseCache.make_key("no", {'a': 1, 'b': 2}) == ResponseCache.make_key("no", {'b': 2, 'a': 1})
+    assert ResponseCache.make_key("no", {'a': 1}) != ResponseCache.make_key("no", {'a': 2})
+    assert ResponseCache.make_key("no", {'a': 1}) != ResponseCache.make_key("no", {'a': 1}, catalog_version=1)
+
+
+def test_cache_keeps_put_response_isolated():
+    """Test changes to a response after caching it do not reach the cache"""
+    cache = ResponseCache(max_size=10)
+    response = {'intent': 'report_issue', 'parameters': {'entities': {'dates': []}}}
+    cache.put(('a', ''), response)
+    response['parameters']['entities']['dates'].append({'value': '2024-09-02'})
+    response['metadata'] = {}
+
+    assert cache.get(('a', '')) == {'intent': 'report_issue', 'parameters': {'entities': {'dates': []}}}
+
+
+def test_make_key_canonical_context():
+    """Test context keys ignore item order but keep value types apart"""
+    make_key = ResponseCache.make_key
+    assert make_key("yes", {'a': 1, 'b': 'x'}) == make_key("yes", {'b': 'x', 'a': 1})
+    assert make_key("yes", {'a': 1}) != make_key("yes", {'a': True})
+    assert make_key("yes", {'a': 1}) != make_key("yes", {'a': '1'})
+    assert make_key("yes", {'a': {'b': [1]}}) == make_key("yes", {'a': {'b': [1]}})
+    assert make_key("yes", {'a': [{1, 2}]}) is None
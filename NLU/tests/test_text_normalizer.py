@@ -0,0 +1,70 @@
+"""
+Unit tests for text normalization
+"""
+
+import random
+import re
+
+import pytest
+
+from text_normalizer import TextNormalizer
+
+
+def reference_normalize(text, language):
+    """The original normalizer: one re.sub per filler word, contraction and fix, in list order"""
+    if not text:
+        return text
+    text = re.sub(r'\s+', ' ', text.strip())
+    for filler in TextNormalizer.FILLER_WORDS.get(language, TextNormalizer.FILLER_WORDS['en']):
+        text = re.sub(r'\b' + re.escape(filler) + r'\b', '', text, flags=re.IGNORECASE)
+    if language == 'en':
+        for contraction, expansion in TextNormalizer.CONTRACTIONS.items():
+            text = re.sub(contraction, expansion, text, flags=re.IGNORECASE)
+    for pattern, replacement in TextNormalizer.TRANSCRIPTION_FIXES.get(language, {}).items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def reference_spoken_number(text, language):
+    """The original spoken-number conversion, one re.sub per number word"""
+    for word, digit in TextNormalizer.NUMBER_WORDS.get(language, TextNormalizer.NUMBER_WORDS['en']).items():
+        text = re.sub(r'\b' + re.escape(word) + r'\b', digit, text, flags=re.IGNORECASE)
+    return text
+
+
+@pytest.fixture(scope='module')
+def normalizer():
+    return TextNormalizer()
+
+
+@pytest.mark.parametrize('text, language', [
+    ("  Um,   I DON'T want   the milk\t\n please ", 'en'),
+    ("well... it's like, you know, to items for me?!", 'en'),
+    ("Number sign 12345678 -- hash 42; pound sign!", 'en'),
+    ("Öö, no niin, tuota... haluan KAKSI maitoa, siis ää!", 'fi'),
+    ("Noniin niinpä: öö öö, ei kiitos.", 'fi'),
+    ("Öhm, alltså jag vill ha ETT PAR liter mjölk, typ va?", 'sv'),
+    ("Va? Typ två paket, eh... åtta!", 'sv'),
+    ("so so   SO", 'de'),
+    ("", 'en'),
+])
+def test_normalize_matches_original(normalizer, text, language):
+    """Test the compiled normalizer gives the original output on diacritics, whitespace and punctuation"""
+    assert normalizer.normalize(text, language) == reference_normalize(text, language)
+    assert normalizer.normalize_spoken_number(text, language) == reference_spoken_number(text, language)
+
+
+def test_normalize_matches_original_randomized(normalizer):
+    """Test parity on random mixes of rule words, diacritics, whitespace and punctuation"""
+    rnd = random.Random(7)
+    words = [word for lang_words in TextNormalizer.FILLER_WORDS.values() for word in lang_words]
+    words += list(TextNormalizer.CONTRACTIONS) + [word for numbers in TextNormalizer.NUMBER_WORDS.values() for word in numbers]
+    words += ['to', 'for', 'hash', 'number sign', 'Öö', 'ÄÄ', 'Åtta', 'mjölk', 'I', 'milk', 'ei', '12']
+    separators = [' ', '  ', '\t', '\n', ', ', '. ', '!', '?', '-', "'", ' ', '']
+    for _ in range(2000):
+        text = ''.join(rnd.choice(words) + rnd.choice(separators) for _ in range(rnd.randint(1, 8)))
+        if rnd.random() < 0.3:
+            text = text.upper()
+        for language in ('en', 'fi', 'sv'):
+            assert normalizer.normalize(text, language) == reference_normalize(text, language)
+            assert normalizer.normalize_spoken_number(text, language) == reference_spoken_number(text, language)
@@ -2,8 +2,7 @@
 Unit tests for validators
 """
 
-import pytest
-from validators import validate_text, validate_context, validate_session_id, validate_batch_request
+from validators import validate_text, validate_context, validate_session_id, validate_batch_request, validate_batch_items
 from errors import ValidationError
 
 
@@ -72,3 +71,25 @@ def test_validate_batch_too_large():
     assert error is not None
     assert error.error_code == "BATCH_TOO_LARGE"
 
+
+def test_validate_batch_items_success():
+    """Test successful per-item batch validation"""
+    items = [
+        {"text": "Hello", "session_id": "session-1"},
+        {"text": "World", "context": {"order_number": "123"}}
+    ]
+    validated, error = validate_batch_items(items)
+    assert error is None
+    assert validated == [
+        {"text": "Hello", "context": {}, "session_id": "session-1"},
+        {"text": "World", "context": {"order_number": "123"}, "session_id": None}
+    ]
+
+
+def test_validate_batch_items_invalid_item():
+    """Test per-item batch with an invalid session ID"""
+    items = [{"text": "Hello"}, {"text": "World", "session_id": "bad@id"}]
+    validated, error = validate_batch_items(items)
+    assert error is not None
+    assert error.error_code == "INVALID_SESSION_ID_FORMAT"
+    assert error.message.startswith("Item 1 in batch")
@@ -4,7 +4,7 @@ Handles voice-to-text transcription characteristics and normalizes text for bett
 """
 
 import re
-from typing import Dict
+from typing import Dict, Pattern, Tuple
 
 
 class TextNormalizer:
@@ -51,9 +51,77 @@ class TextNormalizer:
         }
     }
     
+    # Common contractions - normalized to standard form
+    CONTRACTIONS = {
+        r"don't": "do not",
+        r"doesn't": "does not",
+        r"didn't": "did not",
+        r"won't": "will not",
+        r"can't": "cannot",
+        r"couldn't": "could not",
+        r"shouldn't": "should not",
+        r"wouldn't": "would not",
+        r"isn't": "is not",
+        r"aren't": "are not",
+        r"wasn't": "was not",
+        r"weren't": "were not",
+        r"haven't": "have not",
+        r"hasn't": "has not",
+        r"hadn't": "had not",
+        r"i'm": "i am",
+        r"you're": "you are",
+        r"we're": "we are",
+        r"they're": "they are",
+        r"it's": "it is",
+        r"that's": "that is",
+        r"what's": "what is",
+        r"i'll": "i will",
+        r"you'll": "you will",
+        r"we'll": "we will",
+        r"i'd": "i would",
+        r"you'd": "you would",
+        r"i've": "i have",
+        r"you've": "you have",
+    }
+    
+    # Whitespace runs
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    
     def __init__(self):
-        """Initialize text normalizer"""
-        pass
+        """Initialize text normalizer and compile one pattern per rule set and language"""
+        # Filler words (same order as the list, matching the old one-by-one removal)
+        self.filler_patterns = {
+            lang: re.compile(r'\b(?:' + '|'.join(re.escape(f) for f in fillers) + r')\b', re.IGNORECASE)
+            for lang, fillers in self.FILLER_WORDS.items()
+        }
+        
+        # Contractions and transcription fixes: one alternation per rule set
+        self.contraction_pattern = self._compile_replacements(self.CONTRACTIONS)
+        self.transcription_patterns = {
+            lang: self._compile_replacements(fixes)
+            for lang, fixes in self.TRANSCRIPTION_FIXES.items()
+        }
+    
+    @staticmethod
+    def _compile_replacements(replacements: Dict[str, str]) -> Tuple[Pattern, Dict[str, str]]:
+        """
+        Compile {pattern: replacement} rules into a single alternation
+        
+        Each rule becomes a named group, so the group that matched selects
+        the replacement. Patterns must not contain capturing groups.
+        
+        Args:
+            replacements: Mapping of regex pattern to replacement text
+            
+        Returns:
+            Tuple of (compiled_pattern, group_name_to_replacement)
+        """
+        groups = {f'r{i}': replacement for i, replacement in enumerate(replacements.values())}
+        pattern = re.compile(
+            '|'.join(f'(?P<r{i}>{rule})' for i, rule in enumerate(replacements)),
+            re.IGNORECASE
+        )
+        return pattern, groups
     
     def normalize(self, text: str, language: str = 'en') -> str:
         """
@@ -70,7 +138,7 @@ class TextNormalizer:
             return text
         
         # Step 1: Normalize whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = self.WHITESPACE_PATTERN.sub(' ', text.strip())
         
         # Step 2: Remove filler words
         text = self._remove_filler_words(text, language)
@@ -85,76 +153,31 @@ class TextNormalizer:
         # text = self._normalize_spoken_numbers(text, language)
         
         # Step 6: Normalize punctuation and spacing
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single
+        text = self.WHITESPACE_PATTERN.sub(' ', text)  # Multiple spaces to single
         text = text.strip()
         
         return text
     
     def _remove_filler_words(self, text: str, language: str) -> str:
         """Remove filler words and hesitations"""
-        fillers = self.FILLER_WORDS.get(language, self.FILLER_WORDS['en'])
-        text_lower = text.lower()
-        
-        for filler in fillers:
-            # Remove filler words with word boundaries
-            pattern = r'\b' + re.escape(filler) + r'\b'
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        return text
+        pattern = self.filler_patterns.get(language, self.filler_patterns['en'])
+        return pattern.sub('', text)
     
     def _normalize_contractions(self, text: str, language: str) -> str:
         """Normalize contractions to handle both forms"""
         if language != 'en':
             return text
         
-        # Common contractions - normalize to standard form
-        contractions = {
-            r"don't": "do not",
-            r"doesn't": "does not",
-            r"didn't": "did not",
-            r"won't": "will not",
-            r"can't": "cannot",
-            r"couldn't": "could not",
-            r"shouldn't": "should not",
-            r"wouldn't": "would not",
-            r"isn't": "is not",
-            r"aren't": "are not",
-            r"wasn't": "was not",
-            r"weren't": "were not",
-            r"haven't": "have not",
-            r"hasn't": "has not",
-            r"hadn't": "had not",
-            r"i'm": "i am",
-            r"you're": "you are",
-            r"we're": "we are",
-            r"they're": "they are",
-            r"it's": "it is",
-            r"that's": "that is",
-            r"what's": "what is",
-            r"i'll": "i will",
-            r"you'll": "you will",
-            r"we'll": "we will",
-            r"i'd": "i would",
-            r"you'd": "you would",
-            r"i've": "i have",
-            r"you've": "you have",
-        }
-        
-        for contraction, expansion in contractions.items():
-            text = re.sub(contraction, expansion, text, flags=re.IGNORECASE)
-        
-        return text
+        pattern, groups = self.contraction_pattern
+        return pattern.sub(lambda m: groups[m.lastgroup], text)
     
     def _fix_transcription_errors(self, text: str, language: str) -> str:
         """Fix common voice-to-text transcription errors"""
         if language not in self.TRANSCRIPTION_FIXES:
             return text
         
-        fixes = self.TRANSCRIPTION_FIXES[language]
-        for pattern, replacement in fixes.items():
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        return text
+        pattern, groups = self.transcription_patterns[language]
+        return pattern.sub(lambda m: groups[m.lastgroup], text)
     
     def normalize_spoken_number(self, text: str, language: str = 'en') -> str:
         """
@@ -162,8 +185,13 @@ class TextNormalizer:
         This is optional and can be called separately if needed
         """
         number_words = self.NUMBER_WORDS.get(language, self.NUMBER_WORDS['en'])
+        # Replacements are digits, so they never create a number word: checking the
+        # original text with a plain substring test skips the regex for absent words
+        text_lower = text.lower()
         
         for word, digit in number_words.items():
+            if word not in text_lower:
+                continue
             # Replace with word boundaries
             pattern = r'\b' + re.escape(word) + r'\b'
             text = re.sub(pattern, digit, text, flags=re.IGNORECASE)
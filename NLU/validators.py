@@ -159,3 +159,53 @@ def validate_batch_request(texts: list) -> Tuple[list, Optional[NLUValidationErr
     
     return validated_texts, None
 
+
+def validate_batch_items(items: list) -> Tuple[list, Optional[NLUValidationError]]:
+    """
+    Validate batch request made of per-item payloads
+    
+    Args:
+        items: List of {"text", "context", "session_id"} objects
+        
+    Returns:
+        Tuple of (validated_items, error)
+    """
+    if not isinstance(items, list):
+        return [], NLUValidationError("Batch items must be a list", "INVALID_BATCH_FORMAT")
+    
+    max_batch_size = config.get('validation.max_batch_size', 100)
+    if len(items) > max_batch_size:
+        return [], NLUValidationError(
+            f"Batch size exceeds maximum of {max_batch_size}",
+            "BATCH_TOO_LARGE"
+        )
+    
+    if len(items) == 0:
+        return [], NLUValidationError("Batch request cannot be empty", "EMPTY_BATCH")
+    
+    validated_items = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return [], NLUValidationError(
+                f"Item {i} in batch is not an object",
+                "INVALID_BATCH_ITEM"
+            )
+        
+        text, error = validate_text(item.get('text'))
+        if not error:
+            context, error = validate_context(item.get('context'))
+        if not error:
+            session_id, error = validate_session_id(item.get('session_id'))
+        if error:
+            return [], NLUValidationError(
+                f"Item {i} in batch: {error.message}",
+                error.error_code
+            )
+        
+        validated_items.append({
+            'text': text,
+            'context': context,
+            'session_id': session_id
+        })
+    
+    return validated_items, None